@@ -0,0 +1,58 @@
+"""Benchmark the cost per row for deep paths.
+
+Runs queries with an increasing number of nested wildcards, where only the
+innermost wildcard has many elements, and reports nanoseconds per row with
+and without `(index)` extracts. Run with
+
+    python benchmarks/bench_depth.py
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from json_tabulator import tabulate  # noqa: E402
+
+NUM_ROWS = 100_000
+DEPTHS = [1, 2, 5, 10, 20]
+REPEAT = 5
+
+
+def make_data(depth: int):
+    data = {'x': [{'v': i} for i in range(NUM_ROWS)]}
+    for _ in range(depth - 1):
+        data = {'x': [data]}
+    return data
+
+
+def make_query(depth: int, index: bool):
+    path = '$' + '.x[*]' * depth
+    query = {'v': path + '.v'}
+    if index:
+        query['i'] = path + '.(index)'
+    return tabulate(query)
+
+
+def run(depth: int, index: bool) -> float:
+    plan, data = make_query(depth, index)._plan, make_data(depth)
+    values, errors = [None] * len(plan.names), [None] * len(plan.names)
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in plan.fill(data, values, errors):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best / NUM_ROWS * 1e9
+
+
+def main():
+    print(f'{"wildcards":>10} {"segments":>10} {"ns/row":>10} {"ns/row (index)":>15}')
+    for depth in DEPTHS:
+        print(f'{depth:>10} {2 * depth + 1:>10} {run(depth, False):>10.0f} {run(depth, True):>15.0f}')
+
+
+if __name__ == '__main__':
+    main()
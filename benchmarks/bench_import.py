@@ -0,0 +1,39 @@
+"""Benchmark import time.
+
+Reports the time to import the package and to import `tabulate`, on top of
+the startup time of the interpreter. Each statement runs in a new process
+and the minimum over all repetitions is reported. Run with
+
+    python benchmarks/bench_import.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+REPEAT = 20
+STATEMENTS = [
+    'import json_tabulator',
+    'from json_tabulator import tabulate',
+]
+
+
+def run(statement: str) -> float:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], check=True, env=env, cwd=os.path.dirname(root))
+    return time.perf_counter() - start
+
+
+def main():
+    run(STATEMENTS[-1])  # write bytecode caches
+    baseline = min(run('pass') for _ in range(REPEAT))
+    for statement in STATEMENTS:
+        elapsed = min(run(statement) for _ in range(REPEAT)) - baseline
+        print(f'{statement}: {elapsed * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
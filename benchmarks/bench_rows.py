@@ -0,0 +1,59 @@
+"""Benchmark row construction.
+
+Reports rows per second and the number of `Row` objects created per output
+row for a wide query with converters and defaults. Run with
+
+    python benchmarks/bench_rows.py
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from json_tabulator import tabulate, attribute, api  # noqa: E402
+
+NUM_COLUMNS = 40
+NUM_ROWS = 50_000
+
+
+def make_query():
+    return tabulate({
+        f'c{i}': attribute(f'items[*].c{i}', converter=int if i % 2 else None, default=0)
+        for i in range(NUM_COLUMNS)
+    })
+
+
+def make_data():
+    return {'items': [{f'c{i}': str(i) for i in range(NUM_COLUMNS)} for _ in range(NUM_ROWS)]}
+
+
+class CountingRow(api.Row):
+    count = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingRow.count += 1
+        super().__init__(*args, **kwargs)
+
+
+def main():
+    query, data = make_query(), make_data()
+
+    start = time.perf_counter()
+    num_rows = sum(1 for _ in query.get_rows(data))
+    elapsed = time.perf_counter() - start
+    print(f'rows/sec: {num_rows / elapsed:,.0f}')
+
+    api.Row, row_type = CountingRow, api.Row
+    try:
+        for _ in query.get_rows(data):
+            pass
+    finally:
+        api.Row = row_type
+    print(f'Row objects per row: {CountingRow.count / num_rows:.2f}')
+
+
+if __name__ == '__main__':
+    main()
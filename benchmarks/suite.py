@@ -0,0 +1,338 @@
+"""Benchmark suite for query execution, parsing and conversion.
+
+Every benchmark builds a synthetic document and a query in its setup and
+returns a function that runs the query once and returns the number of
+rows it produced. The suite reports the best time over several
+repetitions, rows per second and the peak memory allocated during a
+single run, which is measured with `tracemalloc` in a separate run. The
+input document is allocated during setup and not included.
+
+Results can be written to a JSON file and compared with the results of
+another commit. Run with
+
+    python benchmarks/suite.py [-k PATTERN] [-o results.json] [--compare baseline.json]
+
+Use `--scale` to change the size of all documents, e.g. `--scale 0.1` for
+a quick run. Only compare results with the same scale on the same machine.
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing as tp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from json_tabulator import tabulate, attribute, cache  # noqa: E402
+from json_tabulator.converters import to_int, to_float, to_datetime  # noqa: E402
+from json_tabulator.parser import _parse_expression  # noqa: E402
+from json_tabulator.query import QueryPlan  # noqa: E402
+
+FORMAT_VERSION = 1
+REPEAT = 5
+
+Run = tp.Callable[[], int]
+BENCHMARKS: dict[str, tp.Callable[[float], Run]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function `setup(scale) -> run` under `name`."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def count(rows: tp.Iterable) -> int:
+    return sum(1 for _ in rows)
+
+
+def size(n: int, scale: float) -> int:
+    return max(1, int(n * scale))
+
+
+# documents
+
+def wide_document(num_rows: int, num_columns: int) -> dict:
+    return {'items': [{f'c{i}': i * j for i in range(num_columns)} for j in range(num_rows)]}
+
+
+def deep_document(num_rows: int, depth: int) -> dict:
+    data = {'x': [{'v': i} for i in range(num_rows)]}
+    for _ in range(depth - 1):
+        data = {'x': [data]}
+    return data
+
+
+def dict_document(num_groups: int, group_size: int) -> dict:
+    return {
+        f'g{i}': {f'k{j}': {'v': j, 'w': str(j)} for j in range(group_size)}
+        for i in range(num_groups)
+    }
+
+
+def inline_document(num_rows: int, num_tags: int) -> dict:
+    return {'items': [
+        {'id': i, 'tags': [{'name': f't{k}'} for k in range(num_tags)]}
+        for i in range(num_rows)
+    ]}
+
+
+def sparse_document(num_rows: int, num_columns: int) -> dict:
+    # every row has about a quarter of the attributes
+    return {'items': [
+        {f'c{i}': i for i in range(num_columns) if (i + j) % 4 == 0}
+        for j in range(num_rows)
+    ]}
+
+
+def string_document(num_rows: int) -> dict:
+    return {'items': [
+        {'i': str(j), 'f': f'{j}.5', 'd': f'2024-01-{j % 28 + 1:02d}T12:00:00', 'bad': 'x' if j % 10 else str(j)}
+        for j in range(num_rows)
+    ]}
+
+
+# execution
+
+@benchmark('execute.wide')
+def execute_wide(scale: float) -> Run:
+    data = wide_document(size(20_000, scale), 40)
+    query = tabulate({f'c{i}': f'items[*].c{i}' for i in range(40)})
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('execute.wide_tuple')
+def execute_wide_tuple(scale: float) -> Run:
+    data = wide_document(size(20_000, scale), 40)
+    query = tabulate({f'c{i}': f'items[*].c{i}' for i in range(40)}, row_type='tuple')
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('execute.deep')
+def execute_deep(scale: float) -> Run:
+    data = deep_document(size(100_000, scale), 10)
+    path = '$' + '.x[*]' * 10
+    query = tabulate({'v': path + '.v', 'i': path + '.(index)'})
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('execute.dict_wildcard')
+def execute_dict_wildcard(scale: float) -> Run:
+    data = dict_document(size(100, scale), 500)
+    query = tabulate({'group': '$.*.(index)', 'key': '$.*.*.(index)', 'v': '$.*.*.v', 'w': '$.*.*.w'})
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('execute.inline')
+def execute_inline(scale: float) -> Run:
+    data = inline_document(size(20_000, scale), 5)
+    query = tabulate({'id': 'items[*].id', 'tags': 'items[*].tags.(inline [*].name)'})
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('execute.sparse')
+def execute_sparse(scale: float) -> Run:
+    data = sparse_document(size(20_000, scale), 20)
+    query = tabulate({f'c{i}': f'items[*].c{i}' for i in range(20)})
+
+    def run():
+        # accessing errors creates the AttributeNotFound errors
+        return count(row.errors for row in query.get_rows(data))
+    return run
+
+
+@benchmark('execute.from_json')
+def execute_from_json(scale: float) -> Run:
+    text = json.dumps(wide_document(size(5_000, scale), 40))
+    query = tabulate({f'c{i}': f'items[*].c{i}' for i in range(0, 40, 4)})
+    return lambda: count(query.get_rows_from_json(text))
+
+
+@benchmark('execute.count_rows')
+def execute_count_rows(scale: float) -> Run:
+    data = deep_document(size(100_000, scale), 10)
+    path = '$' + '.x[*]' * 10
+    query = tabulate({'v': path + '.v', 'i': path + '.(index)'})
+    return lambda: query.count_rows(data)
+
+
+# conversion
+
+@benchmark('convert.scalar')
+def convert_scalar(scale: float) -> Run:
+    data = string_document(size(20_000, scale))
+    query = tabulate({
+        'i': attribute('items[*].i', converter=int),
+        'f': attribute('items[*].f', converter=float),
+        'bad': attribute('items[*].bad', converter=int, default=0),
+    })
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('convert.batch')
+def convert_batch(scale: float) -> Run:
+    data = string_document(size(20_000, scale))
+    query = tabulate({
+        'i': attribute('items[*].i', batch_converter=to_int),
+        'f': attribute('items[*].f', batch_converter=to_float),
+        'bad': attribute('items[*].bad', batch_converter=to_int, default=0),
+    })
+    return lambda: count(query.get_rows(data))
+
+
+@benchmark('convert.datetime')
+def convert_datetime(scale: float) -> Run:
+    data = string_document(size(20_000, scale))
+    query = tabulate({'d': attribute('items[*].d', batch_converter=to_datetime())})
+    return lambda: count(query.get_rows(data))
+
+
+# parsing and planning, rows are expressions and plans
+
+@benchmark('parse.expressions')
+def parse_expressions(scale: float) -> Run:
+    segments = ['.a', '[*]', '.b', '[0]', '."quoted key"', '.*', "['x']"]
+    expressions = [
+        '$' + ''.join(segments[(i + k) % len(segments)] for k in range(i % 8)) + '.c'
+        for i in range(size(5_000, scale))
+    ]
+
+    def run():
+        for expression in expressions:
+            _parse_expression(expression)
+        return len(expressions)
+    return run
+
+
+@benchmark('plan.compile')
+def plan_compile(scale: float) -> Run:
+    query = tabulate({f'c{i}': f'items[*].c{i}' for i in range(40)})._plan
+    query = {name: query.path + query.extracts[query.path][name] for name in query.names}
+    num_plans = size(2_000, scale)
+
+    def run():
+        for _ in range(num_plans):
+            QueryPlan.from_dict(query)
+        return num_plans
+    return run
+
+
+@benchmark('plan.tabulate_cached')
+def plan_tabulate_cached(scale: float) -> Run:
+    query = {f'c{i}': f'items[*].c{i}' for i in range(40)}
+    num_plans = size(20_000, scale)
+
+    def run():
+        for _ in range(num_plans):
+            tabulate(query)
+        return num_plans
+    return run
+
+
+# runner
+
+def measure(run: Run, repeat: int) -> dict[str, tp.Any]:
+    """Return the best time, rows per second and peak memory of `run`."""
+    best, rows = float('inf'), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': best,
+        'rows': rows,
+        'rows_per_sec': rows / best if best > 0 else None,
+        'peak_memory': peak,
+    }
+
+
+def git_commit() -> tp.Optional[str]:
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(names: list[str], scale: float, repeat: int) -> dict[str, tp.Any]:
+    results = {}
+    for name in names:
+        cache.clear()
+        run = BENCHMARKS[name](scale)
+        results[name] = measure(run, repeat)
+        print(format_result(name, results[name]), flush=True)
+    return {
+        'version': FORMAT_VERSION,
+        'commit': git_commit(),
+        'date': dt.datetime.now(dt.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def format_result(name: str, result: dict[str, tp.Any]) -> str:
+    return (
+        f'{name:<24} {result["rows_per_sec"] or 0:>14,.0f} rows/s'
+        f' {result["seconds"] * 1000:>10.1f} ms {result["peak_memory"] / 1024:>10,.0f} KiB'
+    )
+
+
+def compare(baseline: dict[str, tp.Any], current: dict[str, tp.Any]):
+    """Print the ratios of rows per second and peak memory of `current` to `baseline`."""
+    if baseline.get('scale') != current.get('scale'):
+        print(f'warning: scales differ ({baseline.get("scale")} vs {current.get("scale")})')
+    print(f'\ncompared to {baseline.get("commit") or "baseline"}')
+    print(f'{"benchmark":<24} {"speed":>8} {"memory":>8}')
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['rows_per_sec'] or not base['peak_memory']:
+            print(f'{name:<24} {"new":>8}')
+            continue
+        speed = (result['rows_per_sec'] or 0) / base['rows_per_sec']
+        memory = result['peak_memory'] / base['peak_memory']
+        print(f'{name:<24} {speed:>7.2f}x {memory:>7.2f}x')
+
+
+def main(argv: tp.Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='pattern', default='', help='only run benchmarks containing PATTERN')
+    parser.add_argument('-o', '--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='compare with results in this JSON file')
+    parser.add_argument('--scale', type=float, default=1.0, help='scale the size of all documents')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='number of timed repetitions')
+    parser.add_argument('--list', action='store_true', help='list benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.pattern in name]
+    if args.list:
+        print('\n'.join(names))
+        return
+    results = run_suite(names, args.scale, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
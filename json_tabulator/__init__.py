@@ -1,11 +1,49 @@
+"""Simple query language to extract tables from JSON.
+
+Public names are imported on first access (PEP 562), so that importing the
+package is cheap. Avoid importing `typing` here, it is slow to import.
+"""
+
+import importlib
+
+TYPE_CHECKING = False
+
 __all__ = [
     'tabulate',
+    'tabulate_many',
     'attribute',
     'Row',
+    'TupleRow',
+    'Columns',
 ]
 
 
 __version__ = '0.7.0'
 
-from .api import tabulate, attribute
-from .query import Row
+_LAZY_ATTRIBUTES = {
+    'tabulate': '.api',
+    'tabulate_many': '.api',
+    'attribute': '.api',
+    'Row': '.query',
+    'TupleRow': '.query',
+    'Columns': '.columns',
+}
+
+if TYPE_CHECKING:
+    from .api import tabulate, tabulate_many, attribute
+    from .query import Row, TupleRow
+    from .columns import Columns
+
+
+def __getattr__(name: str):
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,107 @@
+"""Run queries from asyncio code, see `Tabulator.aget_rows`.
+
+Rows are produced by the synchronous query machinery. To keep the event
+loop responsive, row production either pauses for the loop every
+`yield_every` rows, or runs in an executor in chunks of `yield_every` rows.
+"""
+
+import asyncio
+import itertools as it
+import typing as tp
+
+if tp.TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from .api import Tabulator
+    from .query import Row
+
+YIELD_EVERY = 1000
+
+
+def check_executor(executor: tp.Optional['Executor']) -> None:
+    """Reject process pools, which cannot run the row generators that are passed to the executor."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    if isinstance(executor, ProcessPoolExecutor):
+        raise TypeError('executor must run in this process, e.g. a ThreadPoolExecutor, got a ProcessPoolExecutor')
+
+
+async def _iter_documents(documents: tp.Union[tp.AsyncIterable[tp.Any], tp.Iterable[tp.Any]]) -> tp.AsyncIterator[tp.Any]:
+    if hasattr(documents, '__aiter__'):
+        async for data in documents:
+            yield data
+    else:
+        for data in documents:
+            yield data
+
+
+def _take(rows: tp.Iterator['Row'], n: int) -> list['Row']:
+    return list(it.islice(rows, n))
+
+
+async def _iter_chunks(
+        rows: tp.Iterator['Row'],
+        yield_every: int,
+        executor: tp.Optional['Executor']
+) -> tp.AsyncIterator[list['Row']]:
+    """Yield lists of at most `yield_every` rows produced in `executor`."""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(executor, _take, rows, yield_every)
+        if chunk:
+            yield chunk
+        if len(chunk) < yield_every:
+            return
+
+
+async def aget_rows(
+        tabulator: 'Tabulator',
+        documents: tp.Union[tp.AsyncIterable[tp.Any], tp.Iterable[tp.Any]],
+        yield_every: int = YIELD_EVERY,
+        executor: tp.Optional['Executor'] = None
+) -> tp.AsyncIterator['Row']:
+    """See `Tabulator.aget_rows`."""
+    count = 0
+    async for data in _iter_documents(documents):
+        rows = tabulator.get_rows(data)
+        if executor is not None:
+            async for chunk in _iter_chunks(rows, yield_every, executor):
+                for row in chunk:
+                    yield row
+            continue
+        for row in rows:
+            yield row
+            count += 1
+            if count >= yield_every:
+                count = 0
+                await asyncio.sleep(0)
+
+
+def _blocking_chunks(source: tp.AsyncIterable[tp.AnyStr], loop: asyncio.AbstractEventLoop) -> tp.Iterator[tp.AnyStr]:
+    """Iterate `source` from a thread other than the thread of `loop`."""
+    iterator = source.__aiter__()
+
+    async def next_chunk():
+        return await iterator.__anext__()
+
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(next_chunk(), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+async def aget_rows_from_json(
+        tabulator: 'Tabulator',
+        source: tp.Any,
+        chunk_size: tp.Optional[int] = None,
+        yield_every: int = YIELD_EVERY,
+        executor: tp.Optional['Executor'] = None
+) -> tp.AsyncIterator['Row']:
+    """See `Tabulator.aget_rows_from_json`."""
+    if hasattr(source, '__aiter__'):
+        # the parser runs in the executor and pulls chunks from the loop
+        source = _blocking_chunks(source, asyncio.get_running_loop())
+    rows = tabulator.get_rows_from_json(source, chunk_size)
+    async for chunk in _iter_chunks(rows, yield_every, executor):
+        for row in chunk:
+            yield row
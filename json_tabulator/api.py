@@ -1,9 +1,21 @@
 from dataclasses import dataclass, replace
+from functools import partial
+from collections import deque
+import itertools as it
 import typing as tp
-from .expression import Expression
-from .query import QueryPlan, Row
+from .expression import Expression, is_function
+from .query import QueryPlan, MultiQueryPlan, Row, TupleRow, NOT_FOUND, named_row_class, attribute_not_found, _Errors
+from .columns import Columns, ColumnBuilder
+from . import ndjson, arrow, cache
 from .parser import parse_expression
 from .exceptions import ConversionFailed
+from .converters import BatchConverter
+from .guards import Guard, Condition, AllOf
+from .stats import Stats, StatsCallback, resolve_stats
+
+CONVERSION_BATCH_SIZE = 1024
+ERROR_MODES = ('collect', 'ignore', 'raise')
+ROW_TYPES = ('dict', 'tuple', 'namedtuple')
 
 
 @dataclass
@@ -13,6 +25,8 @@ class Attribute:
     converter: tp.Optional[tp.Callable[[tp.Any], tp.Any]] = None
     default: tp.Optional[tp.Any] = None
     default_factory: tp.Optional[tp.Callable[[], tp.Any]] = None
+    dtype: tp.Optional[tp.Any] = None
+    batch_converter: tp.Optional[BatchConverter] = None
 
     @property
     def path(self):
@@ -24,15 +38,21 @@ def attribute(
         path: str,
         converter: tp.Optional[tp.Callable[[tp.Any], tp.Any]] = None,
         default: tp.Optional[tp.Any] = None,
-        default_factory: tp.Optional[tp.Callable[[], tp.Any]] = None
+        default_factory: tp.Optional[tp.Callable[[], tp.Any]] = None,
+        dtype: tp.Optional[tp.Any] = None,
+        batch_converter: tp.Optional[BatchConverter] = None
 ):
     if default is not None and default_factory is not None:
         raise ValueError('Cannot specify both default and default_value.')
+    if converter is not None and batch_converter is not None:
+        raise ValueError('Cannot specify both converter and batch_converter.')
     return Attribute(
         expression=parse_expression(path),
         converter=converter,
         default=default,
-        default_factory=default_factory
+        default_factory=default_factory,
+        dtype=dtype,
+        batch_converter=batch_converter
     )
 
 
@@ -42,55 +62,675 @@ class Tabulator:
 
     Attributes:
         attributes: Output attributes.
+        errors: Error handling mode, one of `'collect'`, `'ignore'` or `'raise'`.
+        row_type: Type of the rows, one of `'dict'`, `'tuple'` or `'namedtuple'`.
     """
     attributes: list[Attribute]
     _plan: QueryPlan
+    errors: str = 'collect'
+    row_type: str = 'dict'
 
     @property
     def names(self) -> list[tp.Hashable]:
         """Returns the names of all attributes."""
         return [a.name for a in self.attributes]
 
-    def get_rows(self, data: tp.Any) -> tp.Generator[Row, None, None]:
+    def get_rows(
+            self,
+            data: tp.Any,
+            stats: tp.Optional[tp.Union[Stats, StatsCallback]] = None,
+            workers: tp.Optional[int] = None,
+            executor: tp.Optional[tp.Any] = None,
+            limit: tp.Optional[int] = None
+    ) -> tp.Generator[Row, None, None]:
         """Run query against Python object.
 
+        Args:
+            data: Document to run the query against.
+            stats: Optional `Stats` object that execution statistics are
+                added to, or a function that is called with the statistics
+                as a dict when all rows have been produced. See
+                `json_tabulator.stats`.
+            workers: Split the elements of the first wildcard of the query
+                into contiguous partitions that are processed by `workers`
+                workers. Defaults to the number of CPUs if `executor` is
+                given, otherwise the query runs sequentially.
+            executor: Optional `concurrent.futures.Executor` that processes
+                the partitions. Defaults to a thread pool on free-threaded
+                Python and a process pool otherwise. Process pools require
+                the query to be picklable.
+            limit: Stop the traversal after `limit` rows.
+
         Yields:
             dict[str, typ.Any]: Row generator.
         """
+        _check_limit(limit)
+        if (workers is not None and workers > 1) or executor is not None:
+            if stats is not None:
+                raise ValueError('stats are not supported with workers')
+            from . import parallel
+            return parallel.get_rows(self, data, workers, executor, limit)
+        if stats is not None:
+            return self.get_rows_many((data,), stats=stats, limit=limit)
+        values, errors = self._buffers()
+        fills = self._plan.fill(data, values, errors)
+        if limit is not None:
+            fills = it.islice(fills, limit)
+        return self._make_rows(fills, values, errors)
 
-        return (
-            _apply_converters(row, self.attributes)
-            for row in self._plan.execute(data)
-        )
+    def count_rows(self, data: tp.Any) -> int:
+        """Return the number of rows `get_rows(data)` would produce.
 
+        Only the query path and guards are evaluated, no values are
+        extracted or converted.
+        """
+        return self._plan.count(data)
 
-def _apply_converters(row: Row, attributes: list[Attribute]) -> Row:
-    errors = row.errors
+    def get_rows_many(
+            self,
+            documents: tp.Iterable[tp.Any],
+            with_ordinal: bool = False,
+            stats: tp.Optional[tp.Union[Stats, StatsCallback]] = None,
+            limit: tp.Optional[int] = None
+    ) -> tp.Generator[tp.Union[Row, tuple[int, Row]], None, None]:
+        """Run query against an iterable of Python objects.
 
-    def apply_converter(attr, value):
-        if value is None:
-            if attr.default_factory is not None:
-                return attr.default_factory()
-            else:
-                return attr.default
-        elif attr.converter is None:
-            return value
+        Args:
+            documents: Documents to run the query against.
+            with_ordinal: If True, yield tuples `(ordinal, row)` where `ordinal`
+                is the position of the source document in `documents`.
+            stats: Optional execution statistics, see `get_rows`.
+            limit: Stop the traversal after `limit` rows in total.
+
+        Yields:
+            Rows of all documents in order.
+        """
+        _check_limit(limit)
+        if stats is None:
+            return self._get_rows_many(documents, with_ordinal, limit=limit)
+        stats, callback = resolve_stats(stats)
+        rows = self._instrumented(stats)._get_rows_many(stats.count_documents(documents), with_ordinal, stats, limit)
+        return stats.track_total(rows, callback)
+
+    def _get_rows_many(
+            self,
+            documents: tp.Iterable[tp.Any],
+            with_ordinal: bool,
+            stats: tp.Optional[Stats] = None,
+            limit: tp.Optional[int] = None
+    ) -> tp.Generator[tp.Union[Row, tuple[int, Row]], None, None]:
+        values, errors = self._buffers()
+        fills = self._plan.fill_many(documents, values, errors)
+        if limit is not None:
+            fills = it.islice(fills, limit)
+        if stats is not None:
+            fills = stats.track_fills(fills, self.names, errors)
+        if not with_ordinal:
+            yield from self._make_rows(fills, values, errors)
+            return
+
+        ordinals = deque()
+
+        def track():
+            for ordinal in fills:
+                ordinals.append(ordinal)
+                yield ordinal
+
+        for row in self._make_rows(track(), values, errors):
+            yield ordinals.popleft(), row
+
+    def _instrumented(self, stats: Stats) -> 'Tabulator':
+        """Return a copy of the query that records execution statistics in `stats`."""
+        attributes = [
+            replace(
+                a,
+                converter=None if a.converter is None else stats.converter(a.name, a.converter),
+                batch_converter=(
+                    None if a.batch_converter is None else stats.batch_converter(a.name, a.batch_converter)
+                ),
+            )
+            for a in self.attributes
+        ]
+        return replace(self, attributes=attributes, _plan=self._plan.instrumented(stats))
+
+    def get_rows_from_json(
+            self,
+            source: tp.Any,
+            chunk_size: tp.Optional[int] = None
+    ) -> tp.Generator[Row, None, None]:
+        """Run query against a JSON document without loading it into memory.
+
+        The document is parsed incrementally. Parts of the document that are
+        not needed by the query are skipped and rows are yielded as soon as
+        they are complete.
+
+        Args:
+            source: A file object in text or binary mode, a str or bytes
+                object, or an iterable of str or bytes chunks.
+            chunk_size: Number of characters or bytes to read from file objects at once.
+                Defaults to `stream.CHUNK_SIZE`.
+
+        Yields:
+            dict[str, typ.Any]: Row generator.
+
+        Raises:
+            json.JSONDecodeError: If the document is not valid JSON.
+        """
+        from .stream import fill_stream, CHUNK_SIZE
+
+        chunk_size = chunk_size or CHUNK_SIZE
+        values, errors = self._buffers()
+        return self._make_rows(fill_stream(self._plan, source, values, errors, chunk_size), values, errors)
+
+    def _buffers(self) -> tuple[list, list]:
+        """Return new value and error buffers for `QueryPlan.fill`."""
+        return [None] * len(self.attributes), [None] * len(self.attributes)
+
+    def _make_rows(self, fills: tp.Iterable[tp.Any], values: list, errors: list) -> tp.Iterator[Row]:
+        """Create one converted row from the buffers for every item in `fills`.
+
+        Converters and defaults are applied while the row is filled, so each
+        row is created exactly once. If there are batch converters, rows are
+        converted in chunks of `CONVERSION_BATCH_SIZE` rows.
+        """
+        build = self._row_builder(values, errors)
+        return self._apply_batches(build() for _ in fills)
+
+    def _row_builder(self, values: list, errors: list) -> tp.Callable[[], Row]:
+        """Return a function that creates a row of type `row_type` from the buffers.
+
+        Converters and defaults are applied, batch converters are applied by
+        `_apply_batches`. If there are batch converters and rows are tuples,
+        the function returns intermediate mutable rows.
+        """
+        if self.row_type != 'dict':
+            return self._tuple_row_builder(values, errors)
+        names = self.names
+        conversions = [(slot, a.name, a) for slot, a in enumerate(self.attributes) if _has_conversion(a)]
+        collect = self.errors == 'collect'
+        raise_errors = self.errors == 'raise'
+
+        def build():
+            row = Row(zip(names, values))
+            if any(errors):
+                if raise_errors:
+                    raise _first_error(names, errors)
+                row.errors = {name: e for name, e in zip(names, errors) if e is not None}
+            for slot, name, attr in conversions:
+                value, error = _convert_value(attr, values[slot])
+                row[name] = value
+                if error is not None:
+                    if raise_errors:
+                        raise error
+                    elif collect:
+                        row.errors[name] = error
+            return row
+
+        return build
+
+    def _tuple_row_builder(self, values: list, errors: list) -> tp.Callable[[], tp.Union[TupleRow, '_ListRow']]:
+        names = self.names
+        row_class = TupleRow if self.row_type == 'tuple' else named_row_class(names)
+        conversions = [(slot, a) for slot, a in enumerate(self.attributes) if _has_conversion(a)]
+        batch = any(a.batch_converter is not None for a in self.attributes)
+        collect = self.errors == 'collect'
+        raise_errors = self.errors == 'raise'
+        new = tuple.__new__
+
+        def build():
+            row_errors = None
+            if any(errors):
+                if raise_errors:
+                    raise _first_error(names, errors)
+                row_errors = {name: e for name, e in zip(names, errors) if e is not None}
+            row_values = values
+            if conversions:
+                row_values = values.copy()
+                for slot, attr in conversions:
+                    row_values[slot], error = _convert_value(attr, row_values[slot])
+                    if error is not None:
+                        if raise_errors:
+                            raise error
+                        elif collect:
+                            if row_errors is None:
+                                row_errors = {}
+                            row_errors[attr.name] = error
+            if batch:
+                return _ListRow(row_values, row_errors)
+            row = new(row_class, row_values)
+            if row_errors:
+                row._errors = row_errors
+            return row
+
+        return build
+
+    def _apply_batches(self, rows: tp.Iterable[tp.Any]) -> tp.Iterator[Row]:
+        """Apply batch converters to rows created by `_row_builder` in chunks."""
+        if self.row_type == 'dict':
+            batch_attributes = [(a.name, a) for a in self.attributes if a.batch_converter is not None]
         else:
-            try:
-                return attr.converter(value)
-            except Exception as e:
-                errors[attr.name] = ConversionFailed(
-                    f'Conversion failed with unhandled exception {type(e)}',
-                    value=value,
-                    caused_by=e
+            batch_attributes = [(slot, a) for slot, a in enumerate(self.attributes) if a.batch_converter is not None]
+        if not batch_attributes:
+            return iter(rows)
+        converted = _apply_batch_converters(rows, batch_attributes, self.errors)
+        if self.row_type == 'dict':
+            return converted
+        row_class = TupleRow if self.row_type == 'tuple' else named_row_class(self.names)
+        return (TupleRow.__new__(row_class, row, row._errors) for row in converted)
+
+    def get_columns(self, data: tp.Any) -> Columns:
+        """Run query against Python object and return the result by column.
+
+        Values are accumulated directly into one buffer per attribute without
+        creating rows. Attributes with a `dtype` are returned as `array.array`
+        or NumPy arrays, see `attribute`.
+
+        Returns:
+            Columns: Dict mapping attribute names to columns.
+        """
+        return self._get_columns_many((data,))
+
+    def _get_columns_many(self, documents: tp.Iterable[tp.Any]) -> Columns:
+        builder = ColumnBuilder(self.names, [a.dtype for a in self.attributes], self._column_converters())
+        for values, errors in self._fill_converted(documents):
+            builder.append(values, errors)
+        return builder.build()
+
+    def _fill_converted(self, documents: tp.Iterable[tp.Any]) -> tp.Generator[tuple[list, list], None, None]:
+        """Yield converted value and error buffers for every row.
+
+        The buffers are only valid until the next row is requested.
+        """
+        attributes = self.attributes
+        names = self.names
+        conversions = [(slot, a) for slot, a in enumerate(attributes) if _has_conversion(a)]
+        collect = self.errors == 'collect'
+        raise_errors = self.errors == 'raise'
+        values = [None] * len(attributes)
+        errors = [None] * len(attributes)
+        for data in documents:
+            for _ in self._plan.fill(data, values, errors):
+                if raise_errors and any(errors):
+                    raise _first_error(names, errors)
+                if conversions:
+                    row_values, row_errors = values.copy(), errors.copy()
+                    for slot, attr in conversions:
+                        row_values[slot], error = _convert_value(attr, row_values[slot])
+                        if error is not None:
+                            if raise_errors:
+                                raise error
+                            elif collect:
+                                row_errors[slot] = error
+                    yield row_values, row_errors
+                else:
+                    yield values, errors
+
+    def _column_converters(self) -> list[tp.Optional[tp.Callable[[list], tuple[list, dict]]]]:
+        """Return batch conversion functions for `ColumnBuilder`."""
+        return [
+            None if a.batch_converter is None else partial(_apply_batch_converter, a, errors=self.errors)
+            for a in self.attributes
+        ]
+
+    def get_record_batches(
+            self,
+            documents: tp.Iterable[tp.Any],
+            batch_size: int = arrow.BATCH_SIZE,
+            errors_column: tp.Optional[str] = 'errors'
+    ) -> tp.Generator[tp.Any, None, None]:
+        """Run query against documents and return the result as Arrow record batches.
+
+        Requires `pyarrow`. Batches are produced incrementally, so only one
+        batch is held in memory at a time. Column types are taken from the
+        `dtype` of attributes, which can be a `pyarrow.DataType` or anything
+        accepted by `pyarrow.from_numpy_dtype`. Types of other columns are
+        inferred per batch.
+
+        Args:
+            documents: Documents to run the query against.
+            batch_size: Maximum number of rows per batch.
+            errors_column: Name of a struct column with one boolean field per
+                attribute that is true if the row has an error for the
+                attribute. If None, errors are not reported.
+
+        Yields:
+            pyarrow.RecordBatch: Record batches with one column per attribute.
+        """
+        return arrow.iter_record_batches(self, documents, batch_size, errors_column)
+
+    def write_parquet(
+            self,
+            documents: tp.Iterable[tp.Any],
+            where: tp.Any,
+            batch_size: int = arrow.BATCH_SIZE,
+            errors_column: tp.Optional[str] = 'errors',
+            **kwargs
+    ) -> int:
+        """Run query against documents and write the result to a Parquet file.
+
+        Requires `pyarrow`. See `get_record_batches` for the arguments. The
+        schema of the file is taken from the first batch. Additional keyword
+        arguments are passed to `pyarrow.parquet.ParquetWriter`.
+
+        Returns:
+            The number of rows written.
+        """
+        return arrow.write_parquet(self, documents, where, batch_size, errors_column, **kwargs)
+
+    def aget_rows(
+            self,
+            documents: tp.Union[tp.AsyncIterable[tp.Any], tp.Iterable[tp.Any]],
+            yield_every: tp.Optional[int] = None,
+            executor: tp.Optional[tp.Any] = None
+    ) -> tp.AsyncIterator[Row]:
+        """Run query against documents from an async or sync iterable.
+
+        Args:
+            documents: Documents to run the query against, e.g. an async generator.
+            yield_every: Number of rows after which control is returned to the
+                event loop, so that large documents do not block other tasks.
+                Defaults to `aio.YIELD_EVERY`.
+            executor: Optional `concurrent.futures.Executor` that runs in
+                this process, e.g. a `ThreadPoolExecutor`. If given, rows
+                including their conversion are produced in the executor in
+                chunks of `yield_every` rows. Use this for expensive converters.
+
+        Returns:
+            An async generator of rows.
+
+        Raises:
+            TypeError: If `executor` is a `ProcessPoolExecutor`.
+        """
+        from . import aio
+
+        aio.check_executor(executor)
+        return aio.aget_rows(self, documents, yield_every or aio.YIELD_EVERY, executor)
+
+    def aget_rows_from_json(
+            self,
+            source: tp.Any,
+            chunk_size: tp.Optional[int] = None,
+            yield_every: tp.Optional[int] = None,
+            executor: tp.Optional[tp.Any] = None
+    ) -> tp.AsyncIterator[Row]:
+        """Like `get_rows_from_json`, but for asyncio code.
+
+        The document is parsed in `executor`, or in the default executor of
+        the event loop, in chunks of `yield_every` rows, so that parsing
+        never blocks the loop.
+
+        Args:
+            source: An async iterable of str or bytes chunks, e.g. the body
+                of a streaming HTTP response, or any source supported by
+                `get_rows_from_json`.
+            chunk_size: See `get_rows_from_json`.
+            yield_every: Number of rows produced per call to the executor.
+                Defaults to `aio.YIELD_EVERY`.
+            executor: Optional `concurrent.futures.Executor` that runs in
+                this process, e.g. a `ThreadPoolExecutor`.
+
+        Returns:
+            An async generator of rows.
+
+        Raises:
+            TypeError: If `executor` is a `ProcessPoolExecutor`.
+        """
+        from . import aio
+
+        aio.check_executor(executor)
+        return aio.aget_rows_from_json(self, source, chunk_size, yield_every or aio.YIELD_EVERY, executor)
+
+    def get_rows_from_ndjson(
+            self,
+            source: tp.Any,
+            workers: tp.Optional[int] = None,
+            ordered: bool = True,
+            columns: bool = False,
+            chunk_bytes: int = ndjson.CHUNK_BYTES
+    ) -> tp.Generator[tp.Union[Row, Columns], None, None]:
+        """Run query against newline-delimited JSON (JSON Lines).
+
+        Every non-empty line is parsed as a separate document.
+
+        Args:
+            source: Path to a file, or a file object in text or binary mode.
+            workers: Number of worker processes. If larger than 1, the file is
+                split into chunks of about `chunk_bytes` bytes at line
+                boundaries, and chunks are processed in a process pool.
+                Requires `source` to be a path, and the query including
+                converters to be picklable.
+            ordered: If False, the results of chunks are returned in the order
+                in which they complete.
+            columns: If True, yield a `Columns` object per chunk instead of rows.
+            chunk_bytes: Approximate size of chunks in bytes.
+
+        Yields:
+            Rows, or `Columns` if `columns` is True.
+        """
+        return ndjson.get_rows_from_ndjson(self, source, workers, ordered, columns, chunk_bytes)
+
+
+@dataclass
+class MultiTabulator:
+    """Several queries that are run in a single traversal of the document.
+
+    Attributes:
+        tables: Maps table names to the query of each table.
+    """
+    tables: dict[tp.Hashable, Tabulator]
+    _plan: MultiQueryPlan
+
+    def get_rows(self, data: tp.Any) -> tp.Generator[tuple[tp.Hashable, Row], None, None]:
+        """Run all queries against Python object.
+
+        Yields:
+            Tuples `(table, row)` in the order the rows are found. Rows of
+            tables with batch converters are yielded in chunks of
+            `CONVERSION_BATCH_SIZE` rows, after the rows found before them.
+        """
+        return self.get_rows_many([data])
+
+    def get_rows_many(self, documents: tp.Iterable[tp.Any]) -> tp.Generator[tuple[tp.Hashable, Row], None, None]:
+        """Run all queries against an iterable of Python objects, see `get_rows`."""
+        names = list(self.tables)
+        tabulators = list(self.tables.values())
+        buffers = [t._buffers() for t in tabulators]
+        builders = [t._row_builder(values, errors) for t, (values, errors) in zip(tabulators, buffers)]
+        batched = [any(a.batch_converter is not None for a in t.attributes) for t in tabulators]
+        pending = [[] for _ in tabulators]
+        fill = self._plan.fill
+        for data in documents:
+            for k in fill(data, buffers):
+                if not batched[k]:
+                    yield names[k], builders[k]()
+                    continue
+                pending[k].append(builders[k]())
+                if len(pending[k]) >= CONVERSION_BATCH_SIZE:
+                    for row in tabulators[k]._apply_batches(pending[k]):
+                        yield names[k], row
+                    pending[k] = []
+        for name, tabulator, rows in zip(names, tabulators, pending):
+            for row in tabulator._apply_batches(rows):
+                yield name, row
+
+    def get_rows_from_json(
+            self,
+            source: tp.Any,
+            chunk_size: tp.Optional[int] = None
+    ) -> tp.Generator[tuple[tp.Hashable, Row], None, None]:
+        """Run all queries against a JSON document, parsing it only once.
+
+        The document is loaded into memory, keeping only the parts required
+        by any of the queries. See `Tabulator.get_rows_from_json` for the
+        arguments.
+        """
+        from .stream import load_pruned, CHUNK_SIZE
+
+        plans = [t._plan for t in self.tables.values()]
+        return self.get_rows(load_pruned(plans, source, chunk_size or CHUNK_SIZE))
+
+    def get_tables(self, data: tp.Any) -> dict[tp.Hashable, list[Row]]:
+        """Run all queries against Python object.
+
+        Returns:
+            A dict mapping table names to lists of rows.
+        """
+        tabulators = list(self.tables.values())
+        buffers = [t._buffers() for t in tabulators]
+        builders = [t._row_builder(values, errors) for t, (values, errors) in zip(tabulators, buffers)]
+        tables = [[] for _ in tabulators]
+        for k in self._plan.fill(data, buffers):
+            tables[k].append(builders[k]())
+        return {
+            name: list(tabulator._apply_batches(rows))
+            for name, tabulator, rows in zip(self.tables, tabulators, tables)
+        }
+
+
+def _check_limit(limit: tp.Optional[int]) -> None:
+    if limit is not None and limit < 0:
+        raise ValueError(f'limit must be non-negative, got {limit!r}')
+
+
+def _has_conversion(attr: Attribute) -> bool:
+    """True if values need per-value conversion, batch converters are applied separately."""
+    return attr.batch_converter is None and (
+        attr.converter is not None
+        or attr.default is not None
+        or attr.default_factory is not None
+    )
+
+
+def _convert_value(attr: Attribute, value: tp.Any) -> tuple[tp.Any, tp.Optional[Exception]]:
+    if value is None:
+        if attr.default_factory is not None:
+            return attr.default_factory(), None
+        else:
+            return attr.default, None
+    elif attr.converter is None:
+        return value, None
+    else:
+        try:
+            return attr.converter(value), None
+        except Exception as e:
+            return None, ConversionFailed(
+                f'Conversion failed with unhandled exception {type(e)}',
+                value=value,
+                caused_by=e
+            )
+
+
+def _first_error(names: list[tp.Hashable], errors: list) -> Exception:
+    for name, error in zip(names, errors):
+        if error is NOT_FOUND:
+            return attribute_not_found(name)
+        elif error is not None:
+            return error
+
+
+def _apply_batch_converter(
+        attr: Attribute,
+        values: list,
+        errors: str = 'collect'
+) -> tuple[list, dict[int, Exception]]:
+    """Apply the batch converter of `attr` to non-null values and defaults to null values.
+
+    Args:
+        attr: Attribute with batch converter.
+        values: Values to convert.
+        errors: Error handling mode, see `tabulate`.
+
+    Returns:
+        The converted values and a dict mapping indices to `ConversionFailed` errors.
+    """
+    result = list(values)
+    failures = {}
+    indices = [i for i, value in enumerate(values) if value is not None]
+    if indices:
+        inputs = values if len(indices) == len(values) else [values[i] for i in indices]
+        converted, failed = attr.batch_converter(inputs)
+        for i, value, failure, source in zip(indices, converted, failed, inputs):
+            if failure:
+                result[i] = None
+                failures[i] = ConversionFailed(
+                    'Batch conversion failed',
+                    value=source,
+                    caused_by=failure if isinstance(failure, Exception) else None
                 )
+            else:
+                result[i] = value
+    if failures and errors == 'raise':
+        raise next(iter(failures.values()))
+    elif errors == 'ignore':
+        failures = {}
+    if len(indices) < len(values):
+        for i, value in enumerate(values):
+            if value is None:
+                result[i] = _convert_value(attr, None)[0]
+    return result, failures
+
+
+class _ListRow(_Errors, list):
+    """Mutable row with errors, used while applying batch converters to tuple rows."""
+    __slots__ = ('_errors',)
 
-    data = {a.name: apply_converter(a, row[a.name]) for a in attributes}
-    return Row(data=data, errors=errors)
+    def __init__(self, values: list, errors: tp.Optional[dict] = None):
+        super().__init__(values)
+        self._errors = errors
+
+
+def _apply_batch_converters(
+        rows: tp.Iterable[tp.Union[Row, _ListRow]],
+        attributes: list[tuple[tp.Hashable, Attribute]],
+        errors: str = 'collect'
+) -> tp.Generator[tp.Union[Row, _ListRow], None, None]:
+    """Apply batch converters to chunks of rows in place.
+
+    `attributes` are pairs of the key of the attribute in the rows, i.e.
+    its name or its slot, and the attribute.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(it.islice(rows, CONVERSION_BATCH_SIZE))
+        if not chunk:
+            return
+        for key, attr in attributes:
+            values, failures = _apply_batch_converter(attr, [row[key] for row in chunk], errors)
+            for row, value in zip(chunk, values):
+                row[key] = value
+            for idx, error in failures.items():
+                chunk[idx].errors[attr.name] = error
+        yield from chunk
+
+
+def _parse_guards(
+        guards: dict[str, Guard],
+        where: tp.Sequence[tuple[str, str, tp.Any]]
+) -> tuple[tuple[Expression, Guard], ...]:
+    """Parse guard paths and compile `where` conditions into guards at their tables."""
+    parsed = {}
+    for path, guard in guards.items():
+        parsed[parse_expression(path)] = [guard]
+    for path, op, value in where:
+        expr = parse_expression(path)
+        if is_function(expr):
+            raise ValueError(f'Functions are not supported in conditions: {path}')
+        if op in ('in', 'not in') and isinstance(value, list):
+            value = tuple(value)
+        table = expr.get_table()
+        parsed.setdefault(table, []).append(Condition(tuple(expr[len(table):]), op, value))
+    return tuple(
+        (path, guards[0] if len(guards) == 1 else AllOf(tuple(guards)))
+        for path, guards in parsed.items()
+    )
 
 
 def tabulate(
         attributes: dict[str, tp.Union[str, Attribute]],
+        errors: str = 'collect',
+        row_type: str = 'dict',
+        guards: tp.Optional[dict[str, Guard]] = None,
+        where: tp.Optional[tp.Sequence[tuple[str, str, tp.Any]]] = None,
 ) -> Tabulator:
     """Create a new query.
 
@@ -99,6 +739,26 @@ def tabulate(
         omit_missing_attributes: Controls output for attributes that are not found.
             If False (default), attributes are set to `None`.
             If True, the keys are omitted on row level.
+        errors: How to handle missing attributes and failed conversions.
+            `'collect'` (default) reports them in `Row.errors`,
+            `'ignore'` skips error tracking completely and
+            `'raise'` raises the first error.
+        row_type: Type of the rows.
+            `'dict'` (default) yields `Row` objects, i.e. dicts.
+            `'tuple'` yields `TupleRow` objects, i.e. tuples with values
+            ordered like `Tabulator.names`, which take much less memory.
+            `'namedtuple'` yields named tuples with one field per attribute.
+            All row types provide `errors`.
+        guards: A dict mapping wildcards of the query path, e.g. `'$.events[*]'`,
+            to functions that are called with every element of the wildcard
+            before descending into it. Elements for which the function returns
+            False are skipped and produce no rows. A guard for `'$'` is called
+            with the document. See `json_tabulator.guards`.
+        where: Conditions `(path, op, value)` that rows must satisfy, where `op`
+            is one of `==`, `!=`, `<`, `<=`, `>`, `>=`, `in` or `not in`. Rows
+            where the value at `path` is missing or cannot be compared are
+            dropped. Each condition is checked as a guard at the wildcard of
+            its path, so subtrees are pruned as early as possible.
 
     Returns:
         A `Tabulator` object that represents the query. The query can be run against data
@@ -124,5 +784,43 @@ def tabulate(
         ]
     else:
         raise TypeError(f'Query not understood: {attributes}')
-    plan = QueryPlan.from_dict({a.name: a.expression for a in parsed_attributes})
-    return Tabulator(parsed_attributes, plan)
+    if errors not in ERROR_MODES:
+        raise ValueError(f'errors must be one of {ERROR_MODES}, got {errors!r}')
+    if row_type not in ROW_TYPES:
+        raise ValueError(f'row_type must be one of {ROW_TYPES}, got {row_type!r}')
+    query = tuple((a.name, a.expression) for a in parsed_attributes)
+    collect_errors = errors != 'ignore'
+    parsed_guards = _parse_guards(guards or {}, where or ())
+    plan = cache.plans.get(
+        (query, collect_errors, parsed_guards),
+        lambda: QueryPlan.from_dict(dict(query), collect_errors=collect_errors, guards=dict(parsed_guards))
+    )
+    return Tabulator(parsed_attributes, plan, errors, row_type)
+
+
+def tabulate_many(
+        tables: dict[tp.Hashable, tp.Union[dict[str, tp.Union[str, Attribute]], Tabulator]],
+        errors: str = 'collect',
+        row_type: str = 'dict',
+) -> MultiTabulator:
+    """Create queries for several tables that are extracted in a single traversal.
+
+    Unlike the attributes of a single query, the paths of different tables
+    need not lie on a common path. Parts of the document shared by several
+    tables are visited once.
+
+    Args:
+        tables: A dict mapping table names to queries. Queries are either
+            dicts of attributes, see `tabulate`, or `Tabulator` objects.
+        errors: Error handling mode for queries given as dicts, see `tabulate`.
+        row_type: Type of the rows for queries given as dicts, see `tabulate`.
+
+    Returns:
+        A `MultiTabulator` object. The queries can be run against data by
+        calling `MultiTabulator.get_rows(data)` or `MultiTabulator.get_tables(data)`.
+    """
+    tabulators = {
+        name: query if isinstance(query, Tabulator) else tabulate(query, errors=errors, row_type=row_type)
+        for name, query in tables.items()
+    }
+    return MultiTabulator(tabulators, MultiQueryPlan([t._plan for t in tabulators.values()]))
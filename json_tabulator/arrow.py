@@ -0,0 +1,153 @@
+"""Write query results to Arrow record batches and Parquet files.
+
+Requires `pyarrow`, which is imported on first use.
+"""
+
+import typing as tp
+
+from .columns import Columns, ColumnBuilder
+
+if tp.TYPE_CHECKING:
+    from .api import Tabulator
+
+BATCH_SIZE = 65536
+MAX_PENDING_BATCHES = 16
+"""Number of batches `write_parquet` holds back while column types are unknown."""
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required for Arrow output.') from None
+    return pyarrow
+
+
+def arrow_type(dtype: tp.Any) -> tp.Any:
+    """Return the Arrow type for the `dtype` of an attribute, or None to infer it."""
+    pa = _import_pyarrow()
+    if dtype is None or isinstance(dtype, pa.DataType):
+        return dtype
+    return pa.from_numpy_dtype(dtype)
+
+
+def to_record_batch(columns: Columns, types: list, errors_column: tp.Optional[str]) -> tp.Any:
+    pa = _import_pyarrow()
+    names = [str(name) for name in columns]
+    arrays = [pa.array(column, type=t) for column, t in zip(columns.values(), types)]
+    if errors_column is not None:
+        flags = []
+        for name in columns:
+            mask = columns.error_mask(name)
+            flags.append(pa.array(mask, type=pa.uint8()).cast(pa.bool_()))
+        arrays.append(pa.StructArray.from_arrays(flags, names=names))
+        names.append(errors_column)
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def iter_record_batches(
+        tabulator: 'Tabulator',
+        documents: tp.Iterable[tp.Any],
+        batch_size: int = BATCH_SIZE,
+        errors_column: tp.Optional[str] = 'errors'
+) -> tp.Generator[tp.Any, None, None]:
+    """See `Tabulator.get_record_batches`."""
+    types = [arrow_type(a.dtype) for a in tabulator.attributes]
+    builder = ColumnBuilder(tabulator.names, converters=tabulator._column_converters())
+    emitted = False
+    for values, errors in tabulator._fill_converted(documents):
+        builder.append(values, errors)
+        if builder.num_rows >= batch_size:
+            yield to_record_batch(builder.build(), types, errors_column)
+            emitted = True
+    if builder.num_rows or not emitted:
+        yield to_record_batch(builder.build(), types, errors_column)
+
+
+def _has_null_type(t: tp.Any) -> bool:
+    """True if the Arrow type `t` is or contains the `null` type inferred from missing values."""
+    pa = _import_pyarrow()
+    if pa.types.is_null(t):
+        return True
+    elif pa.types.is_list(t) or pa.types.is_large_list(t):
+        return _has_null_type(t.value_type)
+    elif pa.types.is_struct(t):
+        return any(_has_null_type(field.type) for field in t)
+    return False
+
+
+def _merge_schemas(tables: list) -> tp.Any:
+    """Return the schema of `tables` with the first type of every column that is not null."""
+    pa = _import_pyarrow()
+    fields = []
+    for i, field in enumerate(tables[0].schema):
+        types = [table.schema.field(i).type for table in tables]
+        fields.append(field.with_type(next((t for t in types if not _has_null_type(t)), field.type)))
+    return pa.schema(fields)
+
+
+def _cast(table: tp.Any, schema: tp.Any) -> tp.Any:
+    pa = _import_pyarrow()
+    if table.schema.equals(schema):
+        return table
+    try:
+        return table.cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(
+            f'Column types changed after the Parquet schema was fixed ({e}). '
+            'Specify the dtype of attributes that are missing in the first rows.'
+        ) from e
+
+
+def _open_writer(where: tp.Any, tables: list, kwargs: dict) -> tp.Any:
+    """Create a Parquet writer with the merged schema of `tables` and write them."""
+    import pyarrow.parquet as pq
+
+    schema = _merge_schemas(tables)
+    writer = pq.ParquetWriter(where, schema, **kwargs)
+    try:
+        for table in tables:
+            writer.write_table(_cast(table, schema))
+    except BaseException:
+        writer.close()
+        raise
+    return writer
+
+
+def write_parquet(
+        tabulator: 'Tabulator',
+        documents: tp.Iterable[tp.Any],
+        where: tp.Any,
+        batch_size: int = BATCH_SIZE,
+        errors_column: tp.Optional[str] = 'errors',
+        **kwargs
+) -> int:
+    """See `Tabulator.write_parquet`.
+
+    Columns without a dtype that are null in all rows so far have no
+    type yet. Up to `MAX_PENDING_BATCHES` batches are held back until
+    every column has a type, which the file schema is created from.
+    """
+    pa = _import_pyarrow()
+
+    writer = None
+    pending = []
+    num_rows = 0
+    try:
+        for batch in iter_record_batches(tabulator, documents, batch_size, errors_column):
+            table = pa.Table.from_batches([batch])
+            num_rows += batch.num_rows
+            if writer is not None:
+                writer.write_table(_cast(table, writer.schema))
+                continue
+            pending.append(table)
+            if len(pending) < MAX_PENDING_BATCHES and any(map(_has_null_type, _merge_schemas(pending).types)):
+                continue
+            writer = _open_writer(where, pending, kwargs)
+            pending = []
+        if writer is None:
+            writer = _open_writer(where, pending, kwargs)
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
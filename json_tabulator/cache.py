@@ -0,0 +1,141 @@
+"""Caches for parsed expressions and query plans.
+
+`parse_expression` caches expressions by path string and `tabulate` caches
+plans by the parsed query, so that building the same queries repeatedly
+is cheap. Cached objects are shared and must not be modified.
+"""
+
+import threading
+import typing as tp
+from collections import OrderedDict, namedtuple
+
+EXPRESSION_CACHE_SIZE = 4096
+PLAN_CACHE_SIZE = 512
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """Thread-safe least recently used cache with statistics.
+
+    Args:
+        maxsize: Maximum number of entries. If 0, nothing is cached.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: tp.Hashable, factory: tp.Callable[[], tp.Any]) -> tp.Any:
+        """Return the value for `key`, calling `factory()` to create it if missing.
+
+        Exceptions raised by `factory` are propagated and nothing is cached.
+        Values for unhashable keys are created but not cached.
+        """
+        try:
+            hash(key)
+        except TypeError:
+            with self._lock:
+                self.misses += 1
+            return factory()
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def put(self, key: tp.Hashable, value: tp.Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int):
+        """Change the maximum size, evicting least recently used entries if required."""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def items(self) -> list[tuple[tp.Hashable, tp.Any]]:
+        """Return all entries from least to most recently used."""
+        with self._lock:
+            return list(self._data.items())
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+expressions = LRUCache(EXPRESSION_CACHE_SIZE)
+"""Parsed expressions keyed by path string."""
+
+plans = LRUCache(PLAN_CACHE_SIZE)
+"""Query plans keyed by `(query, collect_errors, guards)`. `query` is a tuple
+of pairs of attribute names and parsed expressions, `guards` a tuple of pairs
+of parsed wildcard expressions and guards."""
+
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Return statistics of the expression and plan caches."""
+    return {'expressions': expressions.info(), 'plans': plans.info()}
+
+
+def clear():
+    """Clear the expression and plan caches."""
+    expressions.clear()
+    plans.clear()
+
+
+def dump(file: tp.BinaryIO):
+    """Write the contents of both caches to a binary file object.
+
+    Plans are stored together with their parsed expressions, so that a
+    process can be started with warm caches using `load`.
+    """
+    import pickle
+
+    pickle.dump({'expressions': expressions.items(), 'plans': plans.items()}, file)
+
+
+def load(file: tp.BinaryIO):
+    """Add entries written by `dump` to the caches.
+
+    Query plans are recompiled when loaded, but expressions are not parsed
+    again. Only load files from trusted sources, since they are unpickled.
+    """
+    import pickle
+
+    state = pickle.load(file)
+    for key, value in state['expressions']:
+        expressions.put(key, value)
+    for key, value in state['plans']:
+        plans.put(key, value)
+
+
+def preload(queries: tp.Iterable[dict[tp.Hashable, str]], errors: str = 'collect'):
+    """Parse and plan `queries`, given as arguments to `tabulate`, ahead of time."""
+    from .api import tabulate
+    for query in queries:
+        tabulate(query, errors=errors)
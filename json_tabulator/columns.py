@@ -0,0 +1,121 @@
+import array
+import typing as tp
+
+from .query import NOT_FOUND, attribute_not_found
+
+
+class Columns(dict):
+    """Dict of columns with errors.
+
+    Attributes:
+        errors: Maps attribute names to dicts mapping row numbers to errors.
+            Missing attributes are only turned into `AttributeNotFound`
+            errors when `errors` is accessed.
+        nulls: Maps attribute names to masks with a 1 for every row where the
+            value is `None`, i.e. missing, null or not converted.
+        num_rows: Number of rows.
+    """
+    def __init__(
+            self,
+            data: tp.Optional[dict] = None,
+            errors: tp.Optional[dict] = None,
+            nulls: tp.Optional[dict] = None,
+            num_rows: int = 0
+    ):
+        if data is not None:
+            super().__init__(data)
+        else:
+            super().__init__()
+        self._errors = errors or {}
+        self._materialized = False
+        self.nulls = nulls or {}
+        self.num_rows = num_rows
+
+    @property
+    def errors(self) -> dict[tp.Hashable, dict[int, Exception]]:
+        if not self._materialized:
+            for name, column_errors in self._errors.items():
+                for row, error in column_errors.items():
+                    if error is NOT_FOUND:
+                        column_errors[row] = attribute_not_found(name)
+            self._materialized = True
+        return self._errors
+
+    def error_mask(self, name: tp.Hashable) -> bytearray:
+        """Return a mask with a 1 for every row with an error for attribute `name`."""
+        mask = bytearray(self.num_rows)
+        for row in self._errors.get(name, ()):
+            mask[row] = 1
+        return mask
+
+
+class ColumnBuilder:
+    """Accumulates rows given as slot buffers into column buffers.
+
+    Args:
+        names: Column names, one per slot.
+        dtypes: Buffer type per column, see `to_buffer`.
+        converters: Optional function per column that is applied to the
+            accumulated list of values and returns the converted values and a
+            dict mapping row numbers to conversion errors.
+    """
+    def __init__(
+            self,
+            names: list[tp.Hashable],
+            dtypes: tp.Optional[list[tp.Any]] = None,
+            converters: tp.Optional[list[tp.Optional[tp.Callable[[list], tuple[list, dict]]]]] = None
+    ):
+        self.names = names
+        self.dtypes = dtypes or [None] * len(names)
+        self.converters = converters or [None] * len(names)
+        self.clear()
+
+    def clear(self):
+        self.num_rows = 0
+        self._columns = [[] for _ in self.names]
+        self._errors = [{} for _ in self.names]
+
+    def append(self, values: list, errors: list):
+        row = self.num_rows
+        for column, value in zip(self._columns, values):
+            column.append(value)
+        for column_errors, error in zip(self._errors, errors):
+            if error is not None:
+                column_errors[row] = error
+        self.num_rows += 1
+
+    def build(self) -> Columns:
+        """Return the accumulated columns and start over."""
+        data, nulls, errors = {}, {}, {}
+        columns = zip(self.names, self.dtypes, self.converters, self._columns, self._errors)
+        for name, dtype, converter, column, column_errors in columns:
+            if converter is not None:
+                column, conversion_errors = converter(column)
+                column_errors.update(conversion_errors)
+            nulls[name] = bytearray(value is None for value in column)
+            data[name] = to_buffer(column, dtype)
+            errors[name] = column_errors
+        columns = Columns(data, errors=errors, nulls=nulls, num_rows=self.num_rows)
+        self.clear()
+        return columns
+
+
+def to_buffer(values: list, dtype: tp.Any = None) -> tp.Any:
+    """Convert a list of values to a column buffer of type `dtype`.
+
+    If `dtype` is `None`, the list is returned unchanged. Array typecodes
+    like `'d'` or `'q'` produce an `array.array`, all other values are
+    interpreted as NumPy dtypes. `None` values are replaced with zero,
+    except for the object dtype, which keeps them.
+    """
+    if dtype is None:
+        return values
+    if isinstance(dtype, str) and dtype in array.typecodes:
+        fill = '\x00' if dtype in ('u', 'w') else 0
+        return array.array(dtype, [fill if value is None else value for value in values])
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(f'NumPy is required for dtype {dtype!r}.') from None
+    fill = None if np.dtype(dtype).kind == 'O' else np.zeros((), dtype=dtype)[()]
+    return np.array([fill if value is None else value for value in values], dtype=dtype)
@@ -0,0 +1,82 @@
+"""Batch converters for `attribute(..., batch_converter=...)`.
+
+A batch converter receives a list of non-null values and returns a tuple
+`(converted, failed)` of two sequences of the same length. An entry in
+`failed` is truthy if the conversion of the respective value failed, in
+which case it may be the exception that caused the failure.
+"""
+
+import datetime as dt
+import typing as tp
+from dataclasses import dataclass
+from functools import partial
+
+BatchConverter = tp.Callable[[list], tuple[tp.Sequence, tp.Sequence]]
+
+
+@dataclass
+class MapConverter:
+    """Batch converter that applies a function to every value.
+
+    All values are first converted in a single call to `map`. Only if that
+    fails, values are converted one by one to find the failures.
+    """
+    func: tp.Callable[[tp.Any], tp.Any]
+
+    def __call__(self, values: list) -> tuple[list, list]:
+        func = self.func
+        try:
+            return list(map(func, values)), [False] * len(values)
+        except Exception:
+            pass
+        converted, failed = [], []
+        for value in values:
+            try:
+                converted.append(func(value))
+                failed.append(False)
+            except Exception as e:
+                converted.append(None)
+                failed.append(e)
+        return converted, failed
+
+
+def from_scalar(func: tp.Callable[[tp.Any], tp.Any]) -> BatchConverter:
+    """Create a batch converter from a function that converts a single value."""
+    return MapConverter(func)
+
+
+to_int = from_scalar(int)
+to_float = from_scalar(float)
+
+
+_BOOLS = {
+    True: True, False: False,
+    'true': True, 'false': False, 'True': True, 'False': False,
+    'TRUE': True, 'FALSE': False, '1': True, '0': False,
+}
+
+
+def _to_bool(value: tp.Any) -> bool:
+    try:
+        return _BOOLS[value]
+    except (KeyError, TypeError):
+        raise ValueError(f'Not a boolean: {value!r}') from None
+
+
+to_bool = from_scalar(_to_bool)
+
+
+def to_datetime(format: tp.Optional[str] = None) -> BatchConverter:
+    """Create a batch converter that parses datetimes.
+
+    Args:
+        format: Format string for `datetime.strptime`. If None, values are
+            parsed with `datetime.fromisoformat`.
+    """
+    if format is None:
+        return from_scalar(dt.datetime.fromisoformat)
+    return from_scalar(partial(_strptime, format))
+
+
+def _strptime(format: str, value: str) -> dt.datetime:
+    return dt.datetime.strptime(value, format)
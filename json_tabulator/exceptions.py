@@ -18,3 +18,6 @@ class ConversionFailed(ValueError):
         super().__init__(msg)
         self.value = value
         self.caused_by = caused_by
+
+    def __reduce__(self):
+        return type(self), (self.args[0], self.value, self.caused_by)
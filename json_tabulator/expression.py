@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import itertools as it
+import typing as tp
 
 
 @dataclass(frozen=True)
@@ -12,6 +13,46 @@ class Star(Segment):
     pass
 
 
+@dataclass(frozen=True)
+class Slice(Segment):
+    """Wildcard over the elements `[start:stop:step]` of an array.
+
+    Bounds follow Python slices, so negative values count from the end.
+    Dicts have no elements.
+    """
+    start: tp.Optional[int] = None
+    stop: tp.Optional[int] = None
+    step: tp.Optional[int] = None
+
+    def to_slice(self) -> slice:
+        return slice(self.start, self.stop, self.step)
+
+    def indices(self, length: int) -> range:
+        """Return the selected indices of an array of `length` elements."""
+        return range(*self.to_slice().indices(length))
+
+    def is_forward(self) -> bool:
+        """True if the selected indices do not depend on the length of the array, see `selects`."""
+        return (
+            (self.start is None or self.start >= 0)
+            and (self.stop is None or self.stop >= 0)
+            and (self.step is None or self.step > 0)
+        )
+
+    def selects(self, idx: int) -> bool:
+        """True if index `idx` is selected. Only valid for forward slices."""
+        start = self.start or 0
+        if idx < start or (self.stop is not None and idx >= self.stop):
+            return False
+        return self.step is None or (idx - start) % self.step == 0
+
+    def __str__(self) -> str:
+        parts = ['' if x is None else str(x) for x in (self.start, self.stop)]
+        if self.step is not None:
+            parts.append(str(self.step))
+        return '[' + ':'.join(parts) + ']'
+
+
 @dataclass(frozen=True)
 class Index(Segment):
     def name(self):
@@ -37,6 +78,10 @@ INDEX = Index()
 PATH = Path()
 
 
+def is_wildcard(seg) -> bool:
+    """True if `seg` iterates over several elements, i.e. is `STAR` or a `Slice`."""
+    return isinstance(seg, (Star, Slice))
+
 
 def is_function(path: tuple):
     if not path:
@@ -49,6 +94,8 @@ class Expression(tuple):
         def render_element(seg):
             if seg is STAR:
                 return '[*]'
+            elif isinstance(seg, Slice):
+                return str(seg)
             elif isinstance(seg, (Path, Index)):
                 return '.' + f'({seg.name()})'
             elif isinstance(seg, Inline):
@@ -71,7 +118,7 @@ class Expression(tuple):
     def get_table(self) -> 'Expression':
         idx = -1
         for i, seg in enumerate(self):
-            if seg is STAR:
+            if is_wildcard(seg):
                 idx = i
         return Expression(self[:idx + 1])
 
@@ -79,7 +126,7 @@ class Expression(tuple):
         return all(a == b for a, b in zip(self, other))
 
     def is_concrete(self) -> bool:
-        return not any(seg is STAR for seg in self)
+        return not any(is_wildcard(seg) for seg in self)
 
     def __add__(self, other: 'Expression') -> 'Expression':
         return Expression(super().__add__(other))
@@ -0,0 +1,148 @@
+"""Guards for `tabulate(..., guards=...)`.
+
+A guard is a function that receives an element of a wildcard `[*]`, or
+the whole document, and returns whether to descend into it. Elements that
+are rejected produce no rows and are not traversed, which makes skipping
+irrelevant subtrees of heterogeneous documents cheap.
+
+Any callable can be used as a guard. The guards in this module can be
+pickled, which is required for processing JSON Lines with multiple
+workers, and tell the streaming reader which keys they read, so that
+rejected elements are skipped without being loaded.
+"""
+
+import operator
+import typing as tp
+from dataclasses import dataclass
+
+from .query import nested_get
+
+Guard = tp.Callable[[tp.Any], bool]
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class HasKeys:
+    """Accepts dicts that contain all of `keys`."""
+    keys: tuple
+
+    def __call__(self, value: tp.Any) -> bool:
+        return isinstance(value, dict) and all(key in value for key in self.keys)
+
+
+@dataclass(frozen=True)
+class FieldIn:
+    """Accepts dicts whose value for `key` is one of `values`."""
+    key: tp.Hashable
+    values: tuple
+
+    @property
+    def keys(self) -> tuple:
+        return (self.key,)
+
+    def __call__(self, value: tp.Any) -> bool:
+        return isinstance(value, dict) and value.get(self.key, _MISSING) in self.values
+
+
+@dataclass(frozen=True)
+class IsType:
+    """Accepts values that are instances of one of `types`."""
+    types: tuple
+
+    @property
+    def keys(self) -> tuple:
+        return ()
+
+    def __call__(self, value: tp.Any) -> bool:
+        return isinstance(value, self.types)
+
+
+def _in(value: tp.Any, values: tp.Container) -> bool:
+    return value in values
+
+
+def _not_in(value: tp.Any, values: tp.Container) -> bool:
+    return value not in values
+
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': _in,
+    'not in': _not_in,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    """Accepts values where the value at the relative path `path` compares to `value`.
+
+    Values are looked up like attributes, and values that are not found or
+    cannot be compared are rejected.
+    """
+    path: tuple
+    op: str
+    value: tp.Any
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f'Operator must be one of {tuple(OPERATORS)}, got {self.op!r}')
+
+    @property
+    def keys(self) -> tp.Optional[tuple]:
+        return self.path[:1] or None
+
+    def __call__(self, data: tp.Any) -> bool:
+        value, found = nested_get(data, self.path)
+        if not found:
+            return False
+        try:
+            return bool(OPERATORS[self.op](value, self.value))
+        except TypeError:
+            return False
+
+
+@dataclass(frozen=True)
+class AllOf:
+    """Accepts values that are accepted by all of `guards`."""
+    guards: tuple
+
+    @property
+    def keys(self) -> tp.Optional[tuple]:
+        keys = [guard_keys(guard) for guard in self.guards]
+        if any(k is None for k in keys):
+            return None
+        return tuple(key for k in keys for key in k)
+
+    def __call__(self, value: tp.Any) -> bool:
+        return all(guard(value) for guard in self.guards)
+
+
+def has_keys(*keys: tp.Hashable) -> HasKeys:
+    """Return a guard that accepts dicts containing all `keys`."""
+    return HasKeys(keys)
+
+
+def field_in(key: tp.Hashable, *values: tp.Any) -> FieldIn:
+    """Return a guard that accepts dicts where `key` has one of `values`.
+
+    Use this to select elements by a discriminator field, e.g.
+    `field_in('type', 'click', 'view')`.
+    """
+    return FieldIn(key, values)
+
+
+def is_type(*types: type) -> IsType:
+    """Return a guard that accepts instances of `types`, e.g. `is_type(dict)`."""
+    return IsType(types)
+
+
+def guard_keys(guard: Guard) -> tp.Optional[tuple]:
+    """Return the keys read by `guard`, or `None` if they are not known."""
+    keys = getattr(guard, 'keys', None)
+    return keys if isinstance(keys, tuple) else None
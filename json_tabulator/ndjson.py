@@ -0,0 +1,131 @@
+"""Run queries against newline-delimited JSON (JSON Lines)."""
+
+import json
+import os
+import typing as tp
+from collections import deque
+
+if tp.TYPE_CHECKING:
+    from concurrent.futures import Future
+    from .api import Tabulator
+
+CHUNK_BYTES = 1 << 24
+
+
+def split_file(path: tp.Union[str, os.PathLike], chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split a file into byte ranges `(start, end)` of about `chunk_bytes` bytes."""
+    size = os.path.getsize(path)
+    return [(start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+
+
+def read_lines(path: tp.Union[str, os.PathLike], start: int, end: int) -> tp.Generator[bytes, None, None]:
+    """Yield all lines that start within the byte range `[start, end)`."""
+    with open(path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                return
+            yield line
+
+
+def iter_line_chunks(lines: tp.Iterable[tp.AnyStr], chunk_bytes: int) -> tp.Generator[list, None, None]:
+    """Group lines into lists of about `chunk_bytes` characters or bytes."""
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def load_documents(lines: tp.Iterable[tp.AnyStr]) -> tp.Generator[tp.Any, None, None]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def process_lines(tabulator: 'Tabulator', lines: tp.Iterable[tp.AnyStr], columns: bool):
+    documents = load_documents(lines)
+    if columns:
+        return tabulator._get_columns_many(documents)
+    return list(tabulator.get_rows_many(documents))
+
+
+_worker_tabulator = None
+
+
+def _init_worker(tabulator: 'Tabulator'):
+    global _worker_tabulator
+    _worker_tabulator = tabulator
+
+
+def _process_range(path: tp.Union[str, os.PathLike], start: int, end: int, columns: bool):
+    return process_lines(_worker_tabulator, read_lines(path, start, end), columns)
+
+
+def get_rows_from_ndjson(
+        tabulator: 'Tabulator',
+        source: tp.Any,
+        workers: tp.Optional[int] = None,
+        ordered: bool = True,
+        columns: bool = False,
+        chunk_bytes: int = CHUNK_BYTES
+) -> tp.Generator:
+    """See `Tabulator.get_rows_from_ndjson`."""
+    if workers is not None and workers > 1:
+        if not isinstance(source, (str, os.PathLike)):
+            raise ValueError('Processing with multiple workers requires a file path.')
+        yield from _run_parallel(tabulator, source, workers, ordered, columns, chunk_bytes)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from _run_sequential(tabulator, f, columns, chunk_bytes)
+    else:
+        yield from _run_sequential(tabulator, source, columns, chunk_bytes)
+
+
+def _run_sequential(tabulator: 'Tabulator', lines: tp.Iterable[tp.AnyStr], columns: bool, chunk_bytes: int):
+    if columns:
+        for chunk in iter_line_chunks(lines, chunk_bytes):
+            yield process_lines(tabulator, chunk, columns)
+    else:
+        yield from tabulator.get_rows_many(load_documents(lines))
+
+
+def _run_parallel(tabulator: 'Tabulator', path, workers: int, ordered: bool, columns: bool, chunk_bytes: int):
+    # imported here since multiprocessing is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tabulator,))
+    try:
+        pending = deque()
+        for start, end in split_file(path, chunk_bytes):
+            if len(pending) >= 2 * workers:
+                yield from _collect(pending, ordered, columns)
+            pending.append(executor.submit(_process_range, path, start, end, columns))
+        while pending:
+            yield from _collect(pending, ordered, columns)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _collect(pending: 'deque[Future]', ordered: bool, columns: bool):
+    """Remove finished futures from `pending` and yield their results."""
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    if ordered:
+        done = [pending.popleft()]
+    else:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+    for future in done:
+        if columns:
+            yield future.result()
+        else:
+            yield from future.result()
@@ -0,0 +1,130 @@
+"""Run a query against one large document with several workers.
+
+See `Tabulator.get_rows(..., workers=...)`. The elements of the first
+wildcard of the query path are split into contiguous partitions. Values
+above the wildcard are extracted once and copied into the buffers of
+every partition, the rest of the plan runs per partition in an executor,
+and rows are yielded in document order.
+"""
+
+import itertools as it
+import os
+import sys
+import typing as tp
+from collections import deque
+
+from .expression import STAR, Slice
+from .query import _MISSING
+
+if tp.TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from .api import Tabulator
+    from .query import Row
+
+PARTITIONS_PER_WORKER = 4
+
+
+def default_executor(workers: int) -> 'Executor':
+    """Return a thread pool on free-threaded Python, otherwise a process pool."""
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    if is_gil_enabled is not None and not is_gil_enabled():
+        return ThreadPoolExecutor(workers)
+    return ProcessPoolExecutor(workers)
+
+
+def partition(keys: tp.Sequence, items: list, num_partitions: int) -> list[tuple[tp.Sequence, list]]:
+    """Split `keys` and `items` into at most `num_partitions` contiguous parts."""
+    size = max(1, -(-len(items) // num_partitions))
+    return [(keys[i:i + size], items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def process_partition(
+        tabulator: 'Tabulator',
+        keys: tp.Sequence,
+        items: list,
+        path: tp.Optional[tuple],
+        values: list,
+        errors: list
+) -> list['Row']:
+    """Return the rows of the elements `items` with `keys` of the first wildcard.
+
+    `path` is the path to the wildcard, and `values` and `errors` hold the
+    values extracted above it.
+    """
+    plan = tabulator._plan
+    star = plan._stops[0]
+    guard = plan._star_guards[star]
+    step = plan._steps[star + 1]
+    values, errors = list(values), list(errors)
+
+    def fills():
+        for key, item in zip(keys, items):
+            if guard is None or guard(item):
+                yield from step(item, None if path is None else path + (key,), values, errors)
+
+    return list(tabulator._make_rows(fills(), values, errors))
+
+
+def _ordered_rows(pending, executor, workers, tabulator, partitions, path, values, errors):
+    for keys, items in partitions:
+        if len(pending) >= 2 * workers:
+            yield from pending.popleft().result()
+        pending.append(executor.submit(process_partition, tabulator, keys, items, path, values, errors))
+    while pending:
+        yield from pending.popleft().result()
+
+
+def get_rows(
+        tabulator: 'Tabulator',
+        data: tp.Any,
+        workers: tp.Optional[int] = None,
+        executor: tp.Optional['Executor'] = None,
+        limit: tp.Optional[int] = None
+) -> tp.Generator['Row', None, None]:
+    """See `Tabulator.get_rows`."""
+    plan = tabulator._plan
+    star = plan._stops[0]
+    if star == len(plan.path):
+        yield from tabulator.get_rows(data, limit=limit)
+        return
+
+    root_guard = plan.guards.get(())
+    if root_guard is not None and not root_guard(data):
+        return
+    values, errors = tabulator._buffers()
+    path = () if plan._track_path else None
+    enter = plan._enter[0]
+    node = data if enter is None else enter(data, path, values, errors)
+    if node is _MISSING:
+        return
+    wildcard = plan.path[star]
+    if isinstance(node, list):
+        if isinstance(wildcard, Slice):
+            keys, items = wildcard.indices(len(node)), node[wildcard.to_slice()]
+        else:
+            keys, items = range(len(node)), node
+    elif isinstance(node, dict) and wildcard == STAR:
+        keys, items = list(node), list(node.values())
+    else:
+        return
+    if path is not None:
+        resolve = plan._resolvers[0]
+        path += plan._suffixes[0] if resolve is None else resolve(data)
+
+    workers = workers or os.cpu_count() or 1
+    partitions = partition(keys, items, workers * PARTITIONS_PER_WORKER)
+    owned = executor is None
+    if owned:
+        executor = default_executor(workers)
+    pending = deque()
+    try:
+        rows = _ordered_rows(pending, executor, workers, tabulator, partitions, path, values, errors)
+        yield from it.islice(rows, limit)
+    finally:
+        # partitions that are not needed any more, e.g. after `limit` rows
+        for future in pending:
+            future.cancel()
+        if owned:
+            executor.shutdown(wait=True, cancel_futures=True)
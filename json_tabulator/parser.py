@@ -1,81 +1,164 @@
-
-from parsy import string, regex, eof, alt, seq, forward_declaration, ParseError
-from .expression import Expression, STAR, INDEX, PATH, Inline
+"""Parser for path expressions.
+
+Grammar::
+
+    expression          := initial_segment inner_segment*
+    initial_segment     := '$' | relative_initial
+    relative_expression := relative_initial inner_segment*
+    relative_initial    := unquoted_member | quoted_member | subscript | '*'
+    inner_segment       := '.' (unquoted_member | quoted_member | '*' | function)
+                         | '.'? subscript
+    subscript           := '[' (slice | integer | quoted_member | '*') ']'
+    slice               := integer? ':' integer? (':' step?)?
+    integer             := '-'? digit+
+    step                := '-'? '0'* [1-9] digit*
+    function            := '(index)' | '(path)' | '(inline' whitespace relative_expression ')'
+
+A '.' must not end the expression. Every rule matches greedily without
+backtracking into a rule that has already matched.
+"""
+
+import re
+import typing as tp
+
+from .expression import Expression, STAR, INDEX, PATH, Inline, Slice, is_wildcard
 from .exceptions import InvalidExpression
+from . import cache
 
+UNQUOTED_MEMBER = re.compile(r'[^"\'.$*\[\]()0-9][^"\'.$*\[\]()]*')
+QUOTED_MEMBER = {q: re.compile(f'(\\\\{q}|[^{q}])+') for q in '"\''}
+NUMBER = re.compile(r'-?\d+')
+SLICE = re.compile(r'(-?\d+)?:(-?\d+)?(?::(-?0*[1-9]\d*)?)?')
+WHITESPACE = re.compile(r'\s*')
 
-dot = string('.').then(eof.should_fail('expression to continue'))
-star = string('*').result(STAR)
-root = string('$').result([])
-forbidden = ''.join(['"', "'", '\\.', '\\$', '\\*', '\\[\\]', '\\(\\)'])
-lparen = string('(')
-rparen = string(')')
-lbracket = string('[')
-rbracket = string(']')
-
-
-def make_quoted_member(q: str):
-    def unquote(s: str) -> str: return s.replace('\\' + q, q)
-    return string(q) >> regex(f'(\\\\{q}|[^{q}])+').map(unquote) << string(q)
-
-
-unquoted_member = regex(f'[^{forbidden}0-9][^{forbidden}]*')
-quoted_member = (make_quoted_member('"') | make_quoted_member("'"))
-number = regex(r'\d+').map(int)
-whitespace = regex(r'\s*')
-func_index =  lparen >> string('index').result(INDEX) << rparen
-func_path = lparen >> string('path').result(PATH) << rparen
-relative_expression = forward_declaration()
-func_inline = lparen >> string('inline') >> whitespace >> relative_expression.map(lambda x: Inline(Expression(x))) << rparen
-function = alt(func_index, func_path, func_inline)
-
-subscript = lbracket >> alt(number, quoted_member, star) << rbracket
-
-relative_initial_segment = alt(
-    unquoted_member,
-    quoted_member,
-    subscript,
-    star,
-)
-initial_segment = alt(root, relative_initial_segment)
-
-inner_segment = alt(
-    dot >> unquoted_member,
-    dot >> quoted_member,
-    dot >> star,
-    dot >> function,
-    dot.optional() >> subscript
-)
-
-
-def concat_list(*args):
-    res = []
-    for a in args:
-        if isinstance(a, list):
-            res += a
-        else:
-            res.append(a)
-    return res
+Result = tp.Optional[tuple[tp.Any, int]]
+"""Parsed value and position after it, or `None` if there is no match."""
 
 
-relative_expression.become(seq(relative_initial_segment, inner_segment.many()).combine(concat_list))
-expression = seq(initial_segment, inner_segment.many()).combine(concat_list)
+def parse_expression(string: str) -> Expression:
+    """Parse a path expression.
 
+    Results are cached in `cache.expressions`.
 
-def parse_expression(string: str) -> Expression:
-    try:
-        res = Expression(expression.parse(string))
-    except ParseError:
-        raise InvalidExpression(string)
+    Raises:
+        InvalidExpression: If the expression contains invalid syntax.
+    """
+    return cache.expressions.get(string, lambda: _parse_expression(string))
+
+
+def _parse_expression(string: str) -> Expression:
+    res = Expression(_parse_segments(string))
 
     for i, part in enumerate(res):
         if part in (PATH, INDEX):
             if i < len(res) - 1:
                 raise InvalidExpression(string)
-            if i == 0 or res[i - 1] != STAR:
+            if i == 0 or not is_wildcard(res[i - 1]):
                 raise InvalidExpression(string)
         elif isinstance(part, Inline):
             if i < len(res) - 1:
                 raise InvalidExpression(string)
 
     return res
+
+
+def _parse_segments(string: str) -> list:
+    """Parse `string` according to the grammar, without checking the placement of functions."""
+    if string.startswith('$'):
+        segments, pos = _segments(string, 1, [])
+    else:
+        initial = _relative_initial(string, 0)
+        if initial is None:
+            raise InvalidExpression(string)
+        segments, pos = _segments(string, initial[1], [initial[0]])
+    if pos != len(string):
+        raise InvalidExpression(string)
+    return segments
+
+
+def _segments(s: str, pos: int, segments: list) -> tuple[list, int]:
+    """Append inner segments starting at `pos` to `segments`."""
+    while True:
+        result = _inner_segment(s, pos)
+        if result is None:
+            return segments, pos
+        segment, pos = result
+        segments.append(segment)
+
+
+def _inner_segment(s: str, pos: int) -> Result:
+    if s.startswith('.', pos) and pos + 1 < len(s):
+        pos += 1
+        result = (
+            _unquoted_member(s, pos)
+            or _quoted_member(s, pos)
+            or _star(s, pos)
+            or _function(s, pos)
+        )
+        if result is not None:
+            return result
+    return _subscript(s, pos)
+
+
+def _relative_initial(s: str, pos: int) -> Result:
+    return (
+        _unquoted_member(s, pos)
+        or _quoted_member(s, pos)
+        or _subscript(s, pos)
+        or _star(s, pos)
+    )
+
+
+def _unquoted_member(s: str, pos: int) -> Result:
+    match = UNQUOTED_MEMBER.match(s, pos)
+    if match is None:
+        return None
+    return match.group(), match.end()
+
+
+def _quoted_member(s: str, pos: int) -> Result:
+    if pos >= len(s) or s[pos] not in QUOTED_MEMBER:
+        return None
+    q = s[pos]
+    match = QUOTED_MEMBER[q].match(s, pos + 1)
+    if match is None or not s.startswith(q, match.end()):
+        return None
+    return match.group().replace('\\' + q, q), match.end() + 1
+
+
+def _star(s: str, pos: int) -> Result:
+    if s.startswith('*', pos):
+        return STAR, pos + 1
+    return None
+
+
+def _subscript(s: str, pos: int) -> Result:
+    if not s.startswith('[', pos):
+        return None
+    pos += 1
+    match = SLICE.match(s, pos) or NUMBER.match(s, pos)
+    if match is not None and match.re is SLICE:
+        result = Slice(*(None if x is None else int(x) for x in match.groups())), match.end()
+    elif match is not None:
+        result = int(match.group()), match.end()
+    else:
+        result = _quoted_member(s, pos) or _star(s, pos)
+    if result is None or not s.startswith(']', result[1]):
+        return None
+    return result[0], result[1] + 1
+
+
+def _function(s: str, pos: int) -> Result:
+    if s.startswith('(index)', pos):
+        return INDEX, pos + 7
+    elif s.startswith('(path)', pos):
+        return PATH, pos + 6
+    elif s.startswith('(inline', pos):
+        pos = WHITESPACE.match(s, pos + 7).end()
+        initial = _relative_initial(s, pos)
+        if initial is None:
+            return None
+        segments, pos = _segments(s, initial[1], [initial[0]])
+        if s.startswith(')', pos):
+            return Inline(Expression(segments)), pos + 1
+    return None
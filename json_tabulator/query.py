@@ -1,19 +1,106 @@
 import typing as tp
-from dataclasses import dataclass
-from collections import defaultdict
+from dataclasses import dataclass, replace
+from collections import defaultdict, namedtuple
+from functools import partial
+from itertools import chain, repeat
 
-from .expression import Expression, STAR, INDEX, PATH, Inline, is_function
+from .expression import Expression, STAR, INDEX, PATH, Inline, Slice, is_function, is_wildcard
 from .exceptions import IncompatiblePaths, AttributeNotFound
 
 
-class Row(dict):
-    """Dict with errors."""
+class _NotFound:
+    def __repr__(self):
+        return 'NOT_FOUND'
+
+    def __reduce__(self):
+        return 'NOT_FOUND'
+
+
+NOT_FOUND = _NotFound()
+"""Shared placeholder for `AttributeNotFound` errors that are created on access."""
+
+
+def attribute_not_found(name: tp.Hashable) -> AttributeNotFound:
+    return AttributeNotFound(f'Attribute {name!r} not found.')
+
+
+class _Errors:
+    """Lazy `errors` property for rows."""
+    __slots__ = ()
+
+    @property
+    def errors(self) -> dict[tp.Hashable, Exception]:
+        errors = self._errors
+        if errors is None:
+            errors = self._errors = {}
+        elif NOT_FOUND in errors.values():
+            for name, error in errors.items():
+                if error is NOT_FOUND:
+                    errors[name] = attribute_not_found(name)
+        return errors
+
+    @errors.setter
+    def errors(self, errors: dict[tp.Hashable, Exception]):
+        self._errors = errors
+
+
+class Row(_Errors, dict):
+    """Dict with errors.
+
+    The errors dict is only allocated if there are errors or it is accessed,
+    and missing attributes are only turned into `AttributeNotFound` errors
+    when `errors` is accessed.
+    """
+    __slots__ = ('_errors',)
+
     def __init__(self, data: tp.Optional[dict] = None, errors=None):
         if data is not None:
             super().__init__(data)
         else:
             super().__init__()
-        self.errors = errors or {}
+        self._errors = errors or None
+
+
+class TupleRow(_Errors, tuple):
+    """Tuple with errors.
+
+    Same as `Row`, but values are stored in a tuple ordered by
+    `Tabulator.names`. The instance dict is only allocated for rows with errors.
+    """
+    _errors = None
+
+    def __new__(cls, values: tp.Iterable = (), errors=None):
+        row = super().__new__(cls, values)
+        if errors:
+            row._errors = errors
+        return row
+
+
+_named_row_classes = {}
+
+
+def named_row_class(names: tp.Sequence[tp.Hashable]) -> type:
+    """Return a named tuple row class with fields `names`.
+
+    Classes are cached by names, so that rows can be pickled. Names that are
+    not valid identifiers are replaced by positional names, see
+    `collections.namedtuple`.
+    """
+    key = tuple(names)
+    cls = _named_row_classes.get(key)
+    if cls is None:
+        base = namedtuple('NamedRow', [str(name) for name in names], rename=True)
+        cls = type('NamedRow', (base, TupleRow), {
+            '__slots__': (),
+            '__module__': __name__,
+            '__reduce__': lambda self: (_make_named_row, (key, tuple(self), self._errors)),
+        })
+        _named_row_classes[key] = cls
+    return cls
+
+
+def _make_named_row(names: tuple, values: tuple, errors: tp.Optional[dict]) -> TupleRow:
+    return TupleRow.__new__(named_row_class(names), values, errors)
 
 
 def nested_get(data, keys) -> tuple[tp.Any, bool]:
@@ -24,7 +111,7 @@ def nested_get(data, keys) -> tuple[tp.Any, bool]:
                 return None, False
             res = res[k]
         elif isinstance(res, list):
-            if not isinstance(k, int) or k >= len(res):
+            if not isinstance(k, int) or not -len(res) <= k < len(res):
                 return None, False
             res = res[k]
     return res, True
@@ -34,10 +121,60 @@ def nested_get(data, keys) -> tuple[tp.Any, bool]:
 class QueryPlan:
     path: Expression
     extracts: dict[Expression, dict[tp.Hashable, tuple]]
+    names: tp.Optional[list[tp.Hashable]] = None
+    collect_errors: bool = True
+    guards: tp.Optional[dict[Expression, tp.Callable[[tp.Any], bool]]] = None
+
+    def __post_init__(self):
+        if self.guards is None:
+            self.guards = {}
+        if self.names is None:
+            self.names = [name for items in self.extracts.values() for name in items]
+        self._track_path = any(
+            item in (INDEX, PATH)
+            for items in self.extracts.values()
+            for item in items.values()
+        )
+        self._compile()
+
+    def __getstate__(self):
+        # Compiled closures cannot be pickled, they are rebuilt on unpickling
+        return {
+            'path': self.path,
+            'extracts': self.extracts,
+            'names': self.names,
+            'collect_errors': self.collect_errors,
+            'guards': self.guards,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__post_init__()
 
     @classmethod
-    def from_dict(cls, query: dict[tp.Hashable, Expression]) -> 'QueryPlan':
+    def from_dict(
+            cls,
+            query: dict[tp.Hashable, Expression],
+            collect_errors: bool = True,
+            guards: tp.Optional[dict[Expression, tp.Callable[[tp.Any], bool]]] = None
+    ) -> 'QueryPlan':
+        """Create a plan from a dict mapping names to expressions.
+
+        Args:
+            query: Maps names to expressions.
+            collect_errors: Whether to report missing attributes.
+            guards: Maps wildcard positions of the query path, given as
+                expressions ending in `[*]`, to functions that are called
+                with every element of the wildcard. Elements for which the
+                function returns False are skipped. A guard for the empty
+                expression is called with the document.
+
+        Raises:
+            IncompatiblePaths: If the paths imply a cross join, or a guard
+                does not refer to a wildcard of the query path.
+        """
         steps = defaultdict(dict)
+        inlines = defaultdict(dict)
         query_path = Expression()
         for name, expr in query.items():
             table = expr.get_table()
@@ -50,66 +187,725 @@ class QueryPlan:
             if is_function(tail):
                 func = tail[-1]
                 if isinstance(func, Inline):
-                    steps[table][name] = (*tail[:-1], InlineQueryPlan.from_expression(func.expression))
+                    # inline attributes with the same table share one sub-traversal
+                    inlines[table, tuple(tail[:-1]), func.expression.get_table()][name] = func.expression
                 else:
                     steps[table][name] = func
             else:
                 steps[table][name] = tuple(tail)
 
-        return cls(path=query_path, extracts=steps)
+        for (table, keys, _), expressions in inlines.items():
+            for name, inline in InlineQueryPlan.from_expressions(expressions).items():
+                steps[table][name] = (*keys, inline)
+
+        for guard_path in guards or {}:
+            at_wildcard = not guard_path or is_wildcard(guard_path[-1])
+            if not at_wildcard or tuple(query_path[:len(guard_path)]) != tuple(guard_path):
+                raise IncompatiblePaths(f'Illegal guard: {guard_path} is not a wildcard of {query_path}.')
+
+        return cls(
+            path=query_path,
+            extracts=steps,
+            names=list(query),
+            collect_errors=collect_errors,
+            guards=dict(guards or {})
+        )
+
+    def instrumented(self, stats) -> 'QueryPlan':
+        """Return a copy of the plan that records visited wildcard elements and
+        the time spent in inline queries in `stats`, see `stats.Stats`."""
+        plan = replace(self)
+        plan._compile(stats)
+        return plan
+
+    def _compile(self, stats=None):
+        """Compile the plan into closures specialized to its path and extracts.
+
+        The path is split at its wildcards. For every position `i`,
+        `_enter[i]` is a function `enter(data, path, values, errors)` that
+        runs the extracts from `path[:i]` up to the next wildcard and
+        resolves the fixed keys and indices in between. It returns the data
+        at the wildcard, or `_MISSING` if there are no rows. It is `None` if
+        there is nothing to do. Extracted values and errors are written into
+        the buffers `values` and `errors`, which hold one slot per name.
+
+        `_wildcards[i](data, track_path)` returns the pairs `(key, item)` of
+        the wildcard at position `i`, see `_items`. `_suffixes[i]` holds the
+        fixed segments from `i` to the next wildcard, which are added to
+        tracked paths. If they contain negative indices, `_resolvers[i]`
+        returns them for given data with the indices they refer to.
+
+        `_steps[i](data, path, values, errors)` runs the plan from position
+        `i` and yields once for every row, see `_execute`.
+
+        If `stats` is given, visited wildcard elements and the time spent in
+        inline queries are recorded in it.
+        """
+        path = self.path
+        slots = {name: i for i, name in enumerate(self.names)}
+        self._extractors = []
+        for i in range(len(path) + 1):
+            items = self.extracts.get(path[:i])
+            extract = _compile_extract(items, slots, self.collect_errors, stats) if items else None
+            self._extractors.append(extract)
+
+        # position of the next wildcard, or the end of the path
+        self._stops = [len(path)] * (len(path) + 1)
+        for i in reversed(range(len(path))):
+            self._stops[i] = i if is_wildcard(path[i]) else self._stops[i + 1]
+        self._enter = [
+            _compile_enter(path[i:stop], self._extractors[i:stop + 1])
+            for i, stop in enumerate(self._stops)
+        ]
+        self._suffixes = [tuple(path[i:stop]) for i, stop in enumerate(self._stops)]
+        self._resolvers = [
+            partial(_resolve_indices, suffix) if any(isinstance(k, int) and k < 0 for k in suffix) else None
+            for suffix in self._suffixes
+        ]
+        self._wildcards = [
+            partial(_slice_items, segment) if isinstance(segment, Slice) else _items
+            for segment in path
+        ]
+        self._star_guards = [
+            self.guards.get(path[:i + 1]) if i < len(path) and is_wildcard(path[i]) else None
+            for i in range(len(path) + 1)
+        ]
+        if stats is not None:
+            self._star_guards = [
+                _counted(guard, stats) if i < len(path) and is_wildcard(path[i]) else None
+                for i, guard in enumerate(self._star_guards)
+            ]
+
+        self._steps = [partial(self._execute, i) for i in range(len(path) + 1)]
+        self._collect = _compile_collect(self)
+        root_guard = self.guards.get(())
+        self._run = self._steps[0] if root_guard is None else _guarded(self._steps[0], root_guard)
+
+    def _execute(self, start: int, data, path: tp.Optional[tuple], values: list, errors: list) -> tp.Iterator[None]:
+        """Run the plan from position `start`, where `path` is the path to `data`.
+
+        Wildcards are iterated with an explicit stack of iterators instead
+        of nested generators, so that every row is yielded directly from
+        this frame and the cost per row does not grow with the depth of
+        the path.
+        """
+        n = len(self.path)
+        enter, stops, suffixes, guards = self._enter, self._stops, self._suffixes, self._star_guards
+        wildcards, resolvers = self._wildcards, self._resolvers
+        track = path is not None
+        node = data
+        if enter[start] is not None:
+            node = enter[start](data, path, values, errors)
+            if node is _MISSING:
+                return
+        star = stops[start]
+        if star == n:
+            yield
+            return
+        if track:
+            path += suffixes[start] if resolvers[start] is None else resolvers[start](data)
+        stack = [(wildcards[star](node, track), star, path)]
+        while stack:
+            items, star, path = stack[-1]
+            child_enter, child_star, guard = enter[star + 1], stops[star + 1], guards[star]
+            suffix, resolve = suffixes[star + 1], resolvers[star + 1]
+            for key, item in items:
+                if guard is not None and not guard(item):
+                    continue
+                child_path = path + (key,) if track else None
+                node = item
+                if child_enter is not None:
+                    node = child_enter(item, child_path, values, errors)
+                    if node is _MISSING:
+                        continue
+                if child_star == n:
+                    yield
+                else:
+                    if track:
+                        child_path += suffix if resolve is None else resolve(item)
+                    stack.append((wildcards[child_star](node, track), child_star, child_path))
+                    break
+            else:
+                stack.pop()
+
+    def fill(self, data, values: list, errors: list) -> tp.Iterator[None]:
+        """Run the plan, writing each row into the buffers `values` and `errors`.
+
+        Both buffers hold one slot per name. Yields once for every row, the
+        buffers are overwritten by the next row.
+        """
+        return self._run(data, () if self._track_path else None, values, errors)
+
+    def collect(self, data) -> list[list]:
+        """Run the plan and return the values of all rows as one list per name."""
+        return self._collect(data)
+
+    def count(self, data) -> int:
+        """Return the number of rows without extracting any values.
+
+        Only the path and the guards are evaluated, by a plan without
+        extracts that is compiled on first use.
+        """
+        skeleton = getattr(self, '_skeleton', None)
+        if skeleton is None:
+            skeleton = self._skeleton = QueryPlan(self.path, {}, [], False, self.guards)
+        return sum(1 for _ in skeleton._run(data, None, [], []))
 
     def execute(self, data) -> tp.Generator[Row, None, None]:
-        def _extract(data, item, path) -> tuple[tp.Any, bool]:
-            if isinstance(item, tuple):
-                if item and isinstance(item[-1], InlineQueryPlan):
-                    d, success = nested_get(data, item[:-1])
-                    if success:
-                        return item[-1].execute(d), success
-                    else:
-                        return None, success
+        names = self.names
+        values = [None] * len(names)
+        errors = [None] * len(names)
+        for _ in self.fill(data, values, errors):
+            yield _make_row(names, values, errors)
+
+    def execute_many(self, documents: tp.Iterable[tp.Any]) -> tp.Generator[tuple[int, Row], None, None]:
+        """Run the plan against many documents, sharing buffers between them.
+
+        Yields:
+            Tuples `(ordinal, row)` where `ordinal` is the position of the source document.
+        """
+        names = self.names
+        values = [None] * len(names)
+        errors = [None] * len(names)
+        for ordinal in self.fill_many(documents, values, errors):
+            yield ordinal, _make_row(names, values, errors)
+
+    def fill_many(self, documents: tp.Iterable[tp.Any], values: list, errors: list) -> tp.Iterator[int]:
+        """Like `fill`, but for many documents. Yields the ordinal of the source document."""
+        path = () if self._track_path else None
+        run = self._run
+        for ordinal, data in enumerate(documents):
+            for _ in run(data, path, values, errors):
+                yield ordinal
+
+
+class MultiQueryPlan:
+    """Runs several query plans in a single traversal.
+
+    The paths of all plans are merged into a trie, so that shared prefixes
+    are visited once. The extractors of every plan write into the buffers
+    of that plan, and guards only apply to the plan they belong to.
+
+    Args:
+        plans: The plans to run.
+    """
+    def __init__(self, plans: list[QueryPlan]):
+        self.plans = plans
+        self._track_path = any(plan._track_path for plan in plans)
+        self._root_guards = [(k, plan.guards[()]) for k, plan in enumerate(plans) if () in plan.guards]
+        self._all = tuple(range(len(plans)))
+        self._steps = {}
+
+    def __getstate__(self):
+        return {'plans': self.plans}
+
+    def __setstate__(self, state):
+        self.__init__(state['plans'])
+
+    def fill(self, data, buffers: list[tuple[list, list]]) -> tp.Iterator[int]:
+        """Run all plans, writing rows into `buffers`, one pair `(values, errors)` per plan.
+
+        Yields the number of the plan for every row, see `QueryPlan.fill`.
+        """
+        tables = self._all
+        if self._root_guards:
+            rejected = {k for k, guard in self._root_guards if not guard(data)}
+            tables = tuple(k for k in tables if k not in rejected)
+        if not tables:
+            return ()
+        return self._step((), tables)(data, () if self._track_path else None, buffers)
+
+    def _step(self, prefix: tuple, tables: tuple[int, ...]) -> tp.Callable:
+        """Return the step for the plans `tables` at the trie node `prefix`.
+
+        Steps are compiled on first use, since guards can select any subset
+        of plans for an element.
+        """
+        key = (prefix, tables)
+        step = self._steps.get(key)
+        if step is None:
+            step = self._steps[key] = self._compile_step(prefix, tables)
+        return step
+
+    def _compile_step(self, prefix: tuple, tables: tuple[int, ...]) -> tp.Callable:
+        plans = self.plans
+        i = len(prefix)
+        extracts = [(k, plans[k]._extractors[i]) for k in tables if plans[k]._extractors[i] is not None]
+        leaves = [k for k in tables if len(plans[k].path) == i]
+        children = defaultdict(list)
+        for k in tables:
+            if len(plans[k].path) > i:
+                children[plans[k].path[i]].append(k)
+        descend = [self._compile_descent(prefix, segment, tuple(ks)) for segment, ks in children.items()]
+        leaves = tuple(leaves)
+        extracts = tuple(extracts)
+
+        # like single plans, only create generator frames where rows of
+        # several branches are combined
+        if not descend and len(extracts) == 1:
+            (k, extract), = extracts
+
+            def step(data, path, buffers):
+                values, errors = buffers[k]
+                extract(data, path, values, errors)
+                return leaves
+        elif not descend:
+            def step(data, path, buffers):
+                for k, extract in extracts:
+                    values, errors = buffers[k]
+                    extract(data, path, values, errors)
+                return leaves
+        elif len(descend) == 1 and not leaves and not extracts:
+            step = descend[0]
+        elif len(descend) == 1 and not leaves:
+            d = descend[0]
+
+            def step(data, path, buffers):
+                for k, extract in extracts:
+                    values, errors = buffers[k]
+                    extract(data, path, values, errors)
+                return d(data, path, buffers)
+        else:
+            # branches cover disjoint plans with separate buffers, so they
+            # can be entered before the rows of earlier branches are consumed
+            def step(data, path, buffers):
+                for k, extract in extracts:
+                    values, errors = buffers[k]
+                    extract(data, path, values, errors)
+                return chain(leaves, *[d(data, path, buffers) for d in descend])
+
+        return step
+
+    def _compile_descent(self, prefix: tuple, segment, tables: tuple[int, ...]) -> tp.Callable:
+        """Return a function that descends from `prefix` into `segment` for `tables`."""
+        child_prefix = prefix + (segment,)
+        if is_wildcard(segment):
+            guards = [(k, self.plans[k].guards.get(child_prefix)) for k in tables]
+            guards = [(k, guard) for k, guard in guards if guard is not None]
+            wildcard = partial(_slice_items, segment) if isinstance(segment, Slice) else _items
+            if not guards:
+                child = self._step(child_prefix, tables)
+
+                if segment != STAR:
+                    def descend(data, path, buffers):
+                        for key, item in wildcard(data, path is not None):
+                            yield from child(item, None if path is None else path + (key,), buffers)
+                elif self._track_path:
+                    def descend(data, path, buffers):
+                        if isinstance(data, list):
+                            items = enumerate(data)
+                        elif isinstance(data, dict):
+                            items = data.items()
+                        else:
+                            return
+                        for key, item in items:
+                            yield from child(item, path + (key,), buffers)
                 else:
-                    return nested_get(data, item)
-            elif item == INDEX:
-                return path[-1], True
-            elif item == PATH:
-                return Expression(path).to_string(), True
+                    def descend(data, path, buffers):
+                        if isinstance(data, dict):
+                            data = data.values()
+                        elif not isinstance(data, list):
+                            return
+                        for item in data:
+                            yield from child(item, None, buffers)
             else:
-                raise TypeError(f'Invalid extraction item type: {type(item)}')
-
-        def _recurse(data, head, tail, path, extract: Row):
-            if head in self.extracts:
-                extract = Row(extract, errors=extract.errors)
-                for name, item in self.extracts[head].items():
-                    value, success = _extract(data, item, path)
-                    extract[name] = value
-                    if not success:
-                        extract.errors[name] = AttributeNotFound()
-            if tail:
-                current, *tail = tail
-                head = head + (current,)
-                if current == STAR and isinstance(data, list):
-                    for idx, item in enumerate(data):
-                        yield from _recurse(item, head, tail, path + (idx,), extract)
-                elif current == STAR and isinstance(data, dict):
-                    for idx, item in data.items():
-                        yield from _recurse(item, head, tail, path + (idx,), extract)
-                elif isinstance(current, str) and isinstance(data, dict):
-                    yield from _recurse(data.get(current), head, tail, path + (current,), extract)
-                elif isinstance(current, int) and isinstance(data, list) and current < len(data):
-                    yield from _recurse(data[current], head, tail, path + (current,), extract)
+                def descend(data, path, buffers):
+                    for key, item in wildcard(data, True):
+                        rejected = {k for k, guard in guards if not guard(item)}
+                        if len(rejected) < len(tables):
+                            child = self._step(child_prefix, tuple(k for k in tables if k not in rejected))
+                            yield from child(item, None if path is None else path + (key,), buffers)
+        else:
+            child = self._step(child_prefix, tables)
+            if isinstance(segment, str):
+                def descend(data, path, buffers):
+                    if isinstance(data, dict):
+                        return child(data.get(segment), None if path is None else path + (segment,), buffers)
+                    return ()
+            elif isinstance(segment, int):
+                def descend(data, path, buffers):
+                    if isinstance(data, list) and -len(data) <= segment < len(data):
+                        key = segment if path is None or segment >= 0 else segment + len(data)
+                        return child(data[segment], None if path is None else path + (key,), buffers)
+                    return ()
             else:
-                yield extract
+                raise TypeError(f'Invalid path segment type: {type(segment)}')
+        return descend
+
+
+def _make_row(names: list[tp.Hashable], values: list, errors: list) -> Row:
+    row = Row(zip(names, values))
+    if any(errors):
+        row.errors = {name: e for name, e in zip(names, errors) if e is not None}
+    return row
+
+
+_MISSING = object()
+
+
+def _items(data, track_path: bool) -> tp.Iterable[tuple[tp.Any, tp.Any]]:
+    """Return the pairs `(key, item)` of a wildcard over `data`.
+
+    Keys are `None` if `track_path` is False.
+    """
+    if isinstance(data, list):
+        return enumerate(data) if track_path else zip(repeat(None), data)
+    elif isinstance(data, dict):
+        return iter(data.items()) if track_path else zip(repeat(None), data.values())
+    return ()
+
+
+def _slice_items(segment: Slice, data, track_path: bool) -> tp.Iterable[tuple[tp.Any, tp.Any]]:
+    """Like `_items`, for the elements of an array selected by `segment`."""
+    if not isinstance(data, list):
+        return ()
+    items = data[segment.to_slice()]
+    return zip(segment.indices(len(data)) if track_path else repeat(None), items)
+
+
+def _resolve_indices(segments: tuple, data) -> tuple:
+    """Return `segments` with negative indices replaced by the indices they refer to in `data`."""
+    resolved = []
+    for segment in segments:
+        if isinstance(data, list) and isinstance(segment, int):
+            if segment < 0:
+                segment += len(data)
+            data = data[segment] if 0 <= segment < len(data) else None
+        elif isinstance(data, dict):
+            data = data.get(segment)
+        resolved.append(segment)
+    return tuple(resolved)
+
+
+def _compile_enter(segments: tuple, extractors: list) -> tp.Optional[tp.Callable]:
+    """Compile the extracts along fixed `segments`, see `QueryPlan._compile`.
+
+    `extractors` holds the extractor before each segment and at the end.
+    """
+    for segment in segments:
+        if not isinstance(segment, (str, int)):
+            raise TypeError(f'Invalid path segment type: {type(segment)}')
+    last = extractors[-1]
+    if not segments:
+        if last is None:
+            return None
+
+        def enter(data, path, values, errors):
+            last(data, path, values, errors)
+            return data
+        return enter
+
+    steps = tuple(zip(extractors, segments))
+
+    def enter(data, path, values, errors):
+        for extract, segment in steps:
+            if extract is not None:
+                extract(data, path, values, errors)
+            if isinstance(segment, str):
+                if not isinstance(data, dict):
+                    return _MISSING
+                data = data.get(segment)
+            elif isinstance(data, list) and -len(data) <= segment < len(data):
+                data = data[segment]
+            else:
+                return _MISSING
+        if last is not None:
+            last(data, path, values, errors)
+        return data
+    return enter
+
+
+def _guarded(step: tp.Callable, guard: tp.Callable[[tp.Any], bool]) -> tp.Callable:
+    """Wrap `step` so that it only runs for data accepted by `guard`."""
+    def guarded(data, path, values, errors):
+        if guard(data):
+            return step(data, path, values, errors)
+        return ()
+    return guarded
+
+
+def _counted(guard: tp.Optional[tp.Callable[[tp.Any], bool]], stats) -> tp.Callable[[tp.Any], bool]:
+    """Wrap the guard of a wildcard so that every element is counted in `stats.nodes`."""
+    def counted(data):
+        stats.nodes += 1
+        return guard is None or guard(data)
+    return counted
+
+
+def _compile_extract(
+        items: dict[tp.Hashable, tp.Any],
+        slots: dict[tp.Hashable, int],
+        collect_errors: bool = True,
+        stats=None
+) -> tp.Callable:
+    """Compile all extractions at one path position into a single function.
+
+    Missing attributes are reported as `NOT_FOUND` in the error buffer, or
+    not at all if `collect_errors` is False. Keys are looked up in a trie,
+    see `_compile_lookup`. Inline attributes that share a plan run it once
+    and take one column each of the result.
+    """
+    lookups = []
+    getters = []
+    inlines = {}
+    for name, item in items.items():
+        if isinstance(item, tuple) and item and isinstance(item[-1], InlineQueryPlan):
+            keys, inline = item[:-1], item[-1]
+            group = (keys, id(inline.plan))
+            if group not in inlines:
+                inlines[group] = (_compile_inline(keys, inline.plan, stats), [])
+            inlines[group][1].append((slots[name], inline.plan.names.index(inline.name)))
+        elif isinstance(item, tuple):
+            lookups.append((slots[name], item))
+        else:
+            getters.append((slots[name], _compile_getter(item)))
+    inlines = tuple((collect, tuple(columns)) for collect, columns in inlines.values())
+
+    lookup = _compile_lookup(lookups, NOT_FOUND if collect_errors else None) if lookups else None
+    if not getters and not inlines:
+        return lookup
+
+    if not collect_errors:
+        def extract(data, path, values, errors):
+            if lookup is not None:
+                lookup(data, path, values, errors)
+            for slot, get in getters:
+                values[slot] = get(data, path)[0]
+            for collect, columns in inlines:
+                result, success = collect(data)
+                for slot, column in columns:
+                    values[slot] = result[column] if success else None
+    else:
+        def extract(data, path, values, errors):
+            if lookup is not None:
+                lookup(data, path, values, errors)
+            for slot, get in getters:
+                value, success = get(data, path)
+                values[slot] = value
+                errors[slot] = None if success else NOT_FOUND
+            for collect, columns in inlines:
+                result, success = collect(data)
+                for slot, column in columns:
+                    values[slot] = result[column] if success else None
+                    errors[slot] = None if success else NOT_FOUND
+
+    return extract
 
-        yield from _recurse(data, Expression(), self.path, (), Row())
+
+def _compile_lookup(lookups: list[tuple[int, tuple]], missing: tp.Any) -> tp.Callable:
+    """Compile the lookup of keys `(slot, keys)` into a trie of functions.
+
+    Every node checks the type of its data once and looks up the next key
+    of all attributes below it, so common prefixes of keys are resolved
+    once. If a key is not found, all attributes below it are set to `None`
+    and their errors to `missing`. Lookups follow `nested_get`, so keys
+    pass through scalars.
+    """
+    own = tuple(slot for slot, keys in lookups if not keys)
+    children = {}
+    for slot, keys in lookups:
+        if keys:
+            children.setdefault(keys[0], []).append((slot, keys[1:]))
+    leaves = []
+    branches = []
+    for key, rest in children.items():
+        if any(keys for _, keys in rest):
+            slots = tuple(slot for slot, _ in rest)
+            branches.append((key, _compile_lookup(rest, missing), slots))
+        else:
+            leaves.extend((key, slot) for slot, _ in rest)
+    leaves = tuple(leaves)
+    branches = tuple(branches)
+
+    def lookup(data, path, values, errors):
+        for slot in own:
+            values[slot] = data
+            errors[slot] = None
+        if isinstance(data, dict):
+            for key, slot in leaves:
+                value = data.get(key, _MISSING)
+                if value is _MISSING:
+                    values[slot] = None
+                    errors[slot] = missing
+                else:
+                    values[slot] = value
+                    errors[slot] = None
+            for key, child, slots in branches:
+                value = data.get(key, _MISSING)
+                if value is _MISSING:
+                    for slot in slots:
+                        values[slot] = None
+                        errors[slot] = missing
+                else:
+                    child(value, path, values, errors)
+        elif isinstance(data, list):
+            for key, slot in leaves:
+                if isinstance(key, int) and -len(data) <= key < len(data):
+                    values[slot] = data[key]
+                    errors[slot] = None
+                else:
+                    values[slot] = None
+                    errors[slot] = missing
+            for key, child, slots in branches:
+                if isinstance(key, int) and -len(data) <= key < len(data):
+                    child(data[key], path, values, errors)
+                else:
+                    for slot in slots:
+                        values[slot] = None
+                        errors[slot] = missing
+        else:
+            for key, slot in leaves:
+                values[slot] = data
+                errors[slot] = None
+            for key, child, slots in branches:
+                child(data, path, values, errors)
+
+    return lookup
+
+
+def _compile_inline(keys: tuple, plan: 'QueryPlan', stats=None) -> tp.Callable[[tp.Any], tuple[tp.Any, bool]]:
+    """Compile a function that runs an inline plan at `keys` and returns its columns.
+
+    If `stats` is given, the time spent in it is recorded in it.
+    """
+    def collect(data):
+        d, success = nested_get(data, keys)
+        if success:
+            return plan.collect(d), success
+        return None, success
+
+    if stats is not None:
+        collect = stats.timed('inline', collect)
+    return collect
+
+
+def _compile_getter(item) -> tp.Callable[[tp.Any, tp.Optional[tuple]], tuple[tp.Any, bool]]:
+    """Compile a single extraction item into a function `get(data, path)`."""
+    if isinstance(item, tuple):
+        if len(item) == 1:
+            key = item[0]
+
+            def get(data, path):
+                if isinstance(data, dict):
+                    value = data.get(key, _MISSING)
+                    if value is _MISSING:
+                        return None, False
+                    return value, True
+                elif isinstance(data, list):
+                    if not isinstance(key, int) or not -len(data) <= key < len(data):
+                        return None, False
+                    return data[key], True
+                return data, True
+        else:
+            def get(data, path):
+                return nested_get(data, item)
+    elif item == INDEX:
+        def get(data, path):
+            return path[-1], True
+    elif item == PATH:
+        def get(data, path):
+            return Expression(path).to_string(), True
+    else:
+        raise TypeError(f'Invalid extraction item type: {type(item)}')
+    return get
+
+
+def _compile_collect(plan: QueryPlan) -> tp.Callable[[tp.Any], list[list]]:
+    """Compile `QueryPlan.collect`.
+
+    If all values are extracted at the end of the path, the path is walked
+    one segment at a time for all elements at once and the values are
+    collected by list comprehensions. Otherwise rows are collected with
+    `QueryPlan.fill`.
+    """
+    names = plan.names
+    items = plan.extracts.get(plan.path, {})
+    direct = (
+        not plan._track_path
+        and not plan.guards
+        and all(extract is None for extract in plan._extractors[:-1])
+        and all(name in items for name in names)
+        and all(isinstance(item, tuple) and not any(isinstance(k, InlineQueryPlan) for k in item) for item in items.values())
+    )
+    if not direct:
+        def collect(data):
+            values, errors = [None] * len(names), [None] * len(names)
+            columns = [[] for _ in names]
+            for _ in plan.fill(data, values, errors):
+                for column, value in zip(columns, values):
+                    column.append(value)
+            return columns
+        return collect
+
+    segments = tuple(plan.path)
+    getters = [_compile_column(items[name]) for name in names]
+
+    def collect(data):
+        nodes = _nodes(segments, data)
+        return [get(nodes) for get in getters]
+    return collect
+
+
+def _nodes(segments: tuple, data) -> list:
+    """Return the values at the end of `segments` for all elements of wildcards in document order."""
+    nodes = [data]
+    for segment in segments:
+        if segment == STAR:
+            children = []
+            for node in nodes:
+                if isinstance(node, list):
+                    children.extend(node)
+                elif isinstance(node, dict):
+                    children.extend(node.values())
+            nodes = children
+        elif isinstance(segment, Slice):
+            selected = segment.to_slice()
+            children = []
+            for node in nodes:
+                if isinstance(node, list):
+                    children.extend(node[selected])
+            nodes = children
+        elif isinstance(segment, str):
+            nodes = [node.get(segment) for node in nodes if isinstance(node, dict)]
+        else:
+            nodes = [node[segment] for node in nodes if isinstance(node, list) and -len(node) <= segment < len(node)]
+    return nodes
+
+
+def _compile_column(item: tuple) -> tp.Callable[[list], list]:
+    """Compile a function that extracts `item` from a list of nodes, see `_compile_getter`."""
+    get = _compile_getter(item)
+    if len(item) == 1 and isinstance(item[0], str):
+        key = item[0]
+
+        def column(nodes):
+            return [node.get(key) if isinstance(node, dict) else get(node, None)[0] for node in nodes]
+    else:
+        def column(nodes):
+            return [get(node, None)[0] for node in nodes]
+    return column
 
 
 @dataclass
 class InlineQueryPlan:
+    """Collects the values of an inline expression into a list.
+
+    Inline expressions with the same table at the same position share
+    `plan`, so that their values are collected in a single traversal.
+    `name` is the name of this expression in `plan`.
+    """
     plan: QueryPlan
+    name: tp.Hashable = '_'
 
     @classmethod
-    def from_expression(cls, expr: Expression):
+    def from_expression(cls, expr: Expression) -> 'InlineQueryPlan':
         return cls(plan=QueryPlan.from_dict({'_': expr}))
 
+    @classmethod
+    def from_expressions(cls, expressions: dict[tp.Hashable, Expression]) -> dict[tp.Hashable, 'InlineQueryPlan']:
+        """Create inline plans for expressions with the same table that share one plan."""
+        plan = QueryPlan.from_dict(expressions)
+        return {name: cls(plan, name) for name in expressions}
+
     def execute(self, data) -> list:
-        return [row['_'] for row in self.plan.execute(data) if '_' in row]
+        return self.plan.collect(data)[self.plan.names.index(self.name)]
@@ -0,0 +1,158 @@
+"""Execution statistics for `Tabulator.get_rows(..., stats=...)`.
+
+Statistics are opt-in. Without `stats`, queries run exactly as before and
+nothing is recorded. With `stats`, the query runs on an instrumented copy
+that counts and times every phase, which makes it slower.
+"""
+
+import time
+import typing as tp
+from collections import Counter
+from dataclasses import dataclass, field
+
+from .query import NOT_FOUND
+
+PHASES = ('total', 'traversal', 'inline', 'conversion')
+
+StatsCallback = tp.Callable[[dict[str, tp.Any]], None]
+
+
+@dataclass
+class Stats:
+    """Counts and cumulative times of query execution.
+
+    Pass an instance as `stats` to accumulate statistics over one or
+    several runs, or pass a callback that receives `to_dict()` of the
+    statistics of a single run when it is finished.
+
+    Attributes:
+        documents: Number of documents processed.
+        rows: Number of rows produced.
+        nodes: Number of visited elements of wildcards, including elements
+            that were rejected by guards.
+        missing: Number of rows by attribute name where the attribute is
+            missing. Not recorded with `errors='ignore'`.
+        conversion_failures: Number of failed conversions by attribute name.
+        times: Cumulative seconds by phase. `'total'` is the time spent
+            producing rows. Of that, `'traversal'` is spent walking documents
+            and extracting values, which includes `'inline'` queries, and
+            `'conversion'` is spent in converters. The rest is spent
+            building rows.
+        converter_times: Cumulative seconds spent in converters by attribute name.
+    """
+    documents: int = 0
+    rows: int = 0
+    nodes: int = 0
+    missing: Counter = field(default_factory=Counter)
+    conversion_failures: Counter = field(default_factory=Counter)
+    times: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    converter_times: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> dict[str, tp.Any]:
+        """Return the statistics as a dict of plain numbers and dicts."""
+        return {
+            'documents': self.documents,
+            'rows': self.rows,
+            'nodes': self.nodes,
+            'missing': dict(self.missing),
+            'conversion_failures': dict(self.conversion_failures),
+            'times': dict(self.times),
+            'converter_times': dict(self.converter_times),
+        }
+
+    def timed(self, phase: str, func: tp.Callable) -> tp.Callable:
+        """Wrap `func` so that the time spent in it is added to `times[phase]`."""
+        times, clock = self.times, time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                times[phase] += clock() - start
+        return timed
+
+    def converter(self, name: tp.Hashable, func: tp.Callable[[tp.Any], tp.Any]) -> tp.Callable[[tp.Any], tp.Any]:
+        """Wrap the converter of attribute `name` to record its time and failures."""
+        times, clock = self.times, time.perf_counter
+
+        def convert(value):
+            start = clock()
+            try:
+                return func(value)
+            except Exception:
+                self.conversion_failures[name] += 1
+                raise
+            finally:
+                elapsed = clock() - start
+                times['conversion'] += elapsed
+                self.converter_times[name] += elapsed
+        return convert
+
+    def batch_converter(self, name: tp.Hashable, func: tp.Callable[[list], tuple]) -> tp.Callable[[list], tuple]:
+        """Wrap the batch converter of attribute `name` to record its time and failures."""
+        times, clock = self.times, time.perf_counter
+
+        def convert(values):
+            start = clock()
+            try:
+                converted, failed = func(values)
+            finally:
+                elapsed = clock() - start
+                times['conversion'] += elapsed
+                self.converter_times[name] += elapsed
+            failures = sum(1 for failure in failed if failure)
+            if failures:
+                self.conversion_failures[name] += failures
+            return converted, failed
+        return convert
+
+    def count_documents(self, documents: tp.Iterable[tp.Any]) -> tp.Iterator[tp.Any]:
+        for data in documents:
+            self.documents += 1
+            yield data
+
+    def track_fills(self, fills: tp.Iterable[tp.Any], names: list[tp.Hashable], errors: list) -> tp.Iterator[tp.Any]:
+        """Time the traversal in `fills` and count rows and missing attributes in `errors`."""
+        times, missing, clock = self.times, self.missing, time.perf_counter
+        fills = iter(fills)
+        while True:
+            start = clock()
+            try:
+                item = next(fills)
+            except StopIteration:
+                return
+            finally:
+                times['traversal'] += clock() - start
+            self.rows += 1
+            for name, error in zip(names, errors):
+                if error is NOT_FOUND:
+                    missing[name] += 1
+            yield item
+
+    def track_total(self, rows: tp.Iterable[tp.Any], callback: tp.Optional[StatsCallback] = None) -> tp.Iterator[tp.Any]:
+        """Time producing `rows`, and call `callback` with the statistics when done."""
+        times, clock = self.times, time.perf_counter
+        rows = iter(rows)
+        try:
+            while True:
+                start = clock()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    return
+                finally:
+                    times['total'] += clock() - start
+                yield row
+        finally:
+            if callback is not None:
+                callback(self.to_dict())
+
+
+def resolve_stats(stats: tp.Union[Stats, StatsCallback]) -> tuple[Stats, tp.Optional[StatsCallback]]:
+    """Return the `Stats` to record into and the callback for the `stats` argument."""
+    if isinstance(stats, Stats):
+        return stats, None
+    elif callable(stats):
+        return Stats(), stats
+    raise TypeError(f'stats must be a Stats object or a callable, got {type(stats)}')
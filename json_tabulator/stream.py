@@ -0,0 +1,478 @@
+"""Run queries against JSON text without loading the whole document.
+
+The document is read incrementally and walked along `QueryPlan.path`.
+Subtrees that are not touched by the query are skipped without creating
+Python objects, and rows are yielded as soon as the values they depend on
+have been read. If an extracted value only appears in the document after
+the nested table it belongs to, the nested table is loaded into memory
+(pruned to the requested data) and processed when the enclosing object ends.
+"""
+
+import codecs
+import json
+import re
+import typing as tp
+from json.decoder import scanstring
+
+from .expression import STAR, Slice, is_wildcard
+from .guards import guard_keys
+from .query import QueryPlan, InlineQueryPlan, Row, _make_row
+
+CHUNK_SIZE = 65536
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARS = re.compile(r'[-+0-9.eE]*')
+NUMBER = re.compile(r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?')
+STRUCTURE = re.compile(r'["\[\]{}]')
+STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+LITERALS = {'true': True, 'false': False, 'null': None}
+
+Spec = tp.Union[None, bool, dict]
+"""Describes which parts of a value are required.
+
+`None` means nothing, `True` means the whole value and a dict maps keys,
+indices, `STAR` or slices to the specs of the respective children.
+"""
+
+
+class JsonReader:
+    """Incremental JSON reader.
+
+    Args:
+        source: A file object in text or binary mode, a str or bytes object,
+            or an iterable of str or bytes chunks. Bytes are decoded as UTF-8.
+        chunk_size: Number of characters or bytes to read from file objects at once.
+    """
+    def __init__(self, source: tp.Any, chunk_size: int = CHUNK_SIZE):
+        self._chunks = _iter_chunks(source, chunk_size)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        # position of `buf` in the whole input, for error messages
+        self.offset = 0
+        self.lineno = 1
+        self.line_start = 0
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer. Returns False at the end of input."""
+        if self.eof:
+            return False
+        self.offset, self.lineno, self.line_start = self._locate(self.pos)
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        for chunk in self._chunks:
+            if not isinstance(chunk, str):
+                chunk = self._decoder.decode(chunk)
+            if chunk:
+                self.buf += chunk
+                return True
+        self.eof = True
+        tail = self._decoder.decode(b'', final=True)
+        self.buf += tail
+        return bool(tail)
+
+    def _locate(self, pos: int) -> tp.Tuple[int, int, int]:
+        """Return offset, line number and line start of `pos` in the whole input."""
+        lineno, line_start = self.lineno, self.line_start
+        newlines = self.buf.count('\n', 0, pos)
+        if newlines:
+            lineno += newlines
+            line_start = self.offset + self.buf.rindex('\n', 0, pos) + 1
+        return self.offset + pos, lineno, line_start
+
+    def error(self, msg: str, pos: tp.Optional[int] = None):
+        """Raise a `json.JSONDecodeError` at `pos` in the buffer, reported relative to the whole input."""
+        pos = self.pos if pos is None else pos
+        offset, lineno, line_start = self._locate(pos)
+        err = json.JSONDecodeError(msg, self.buf, pos)
+        err.pos, err.lineno, err.colno = offset, lineno, offset - line_start + 1
+        err.args = (f'{msg}: line {err.lineno} column {err.colno} (char {err.pos})',)
+        raise err
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end of input."""
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            self.error(f'Expecting {char!r}')
+        self.pos += 1
+
+    def iter_object(self) -> tp.Generator[str, None, None]:
+        """Iterate over the keys of an object. The caller must consume every value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                self.error('Expecting property name enclosed in double quotes')
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            c = self.peek()
+            self.pos += 1
+            if c == '}':
+                return
+            elif c != ',':
+                self.pos -= 1
+                self.error("Expecting ',' delimiter")
+
+    def iter_array(self) -> tp.Generator[int, None, None]:
+        """Iterate over the indices of an array. The caller must consume every value."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        idx = 0
+        while True:
+            yield idx
+            idx += 1
+            c = self.peek()
+            self.pos += 1
+            if c == ']':
+                return
+            elif c != ',':
+                self.pos -= 1
+                self.error("Expecting ',' delimiter")
+
+    def read_string(self) -> str:
+        while STRING_TAIL.match(self.buf, self.pos + 1) is None:
+            if not self._fill():
+                self.error('Unterminated string')
+        try:
+            value, self.pos = scanstring(self.buf, self.pos + 1)
+        except json.JSONDecodeError as e:
+            self.error(e.msg, e.pos)
+        return value
+
+    def read_scalar(self) -> tp.Any:
+        c = self.peek()
+        if c == '"':
+            return self.read_string()
+        elif c == '-' or '0' <= c <= '9':
+            while NUMBER_CHARS.match(self.buf, self.pos).end() == len(self.buf):
+                if not self._fill():
+                    break
+            end = NUMBER_CHARS.match(self.buf, self.pos).end()
+            match = NUMBER.fullmatch(self.buf, self.pos, end)
+            if match is None:
+                self.error('Expecting value')
+            self.pos = end
+            integer, frac, exp = match.groups()
+            if frac or exp:
+                return float(match.group())
+            return int(integer)
+        for literal, value in LITERALS.items():
+            if c == literal[0]:
+                while len(self.buf) - self.pos < len(literal) and self._fill():
+                    pass
+                if self.buf.startswith(literal, self.pos):
+                    self.pos += len(literal)
+                    return value
+        self.error('Expecting value')
+
+    def read_value(self) -> tp.Any:
+        """Read the next value completely."""
+        c = self.peek()
+        if c == '{':
+            return {key: self.read_value() for key in self.iter_object()}
+        elif c == '[':
+            return [self.read_value() for _ in self.iter_array()]
+        return self.read_scalar()
+
+    def read_pruned(self, spec: Spec) -> tp.Any:
+        """Read the next value, keeping only the parts required by `spec`.
+
+        Values of keys in `spec` and elements of wildcards are kept as
+        `None` if nothing inside them is required, since the presence of an
+        element can produce a row. Array elements that are skipped but
+        precede a required index are replaced by `None`, so that indices are
+        preserved. Negative indices and slices that count from the end
+        depend on the length of the array, so all elements are read for
+        them and the length is kept.
+        """
+        if spec is None:
+            self.skip_value()
+            return None
+        elif spec is True:
+            return self.read_value()
+        c = self.peek()
+        star = spec.get(STAR)
+        keep_all = STAR in spec
+        if c == '{':
+            result = {}
+            for key in self.iter_object():
+                child = merge_specs(spec.get(key), star)
+                if child is not None:
+                    result[key] = self.read_pruned(child)
+                else:
+                    self.skip_value()
+                    if keep_all or key in spec:
+                        result[key] = None
+            return result
+        elif c == '[':
+            # specs of elements that are only known once the length is known
+            relative = None
+            forward = []
+            for k, child in spec.items():
+                if isinstance(k, Slice) and k.is_forward():
+                    forward.append((k, child))
+                elif isinstance(k, Slice) or (isinstance(k, int) and k < 0):
+                    relative = merge_specs(relative, child)
+                    keep_all = True
+            star = merge_specs(star, relative)
+            last = max((k for k in spec if isinstance(k, int)), default=-1)
+            for k, _ in forward:
+                last = max(last, float('inf') if k.stop is None else k.stop - 1)
+            if keep_all:
+                last = float('inf')
+            result = []
+            for idx in self.iter_array():
+                child = merge_specs(spec.get(idx), star)
+                for k, spec_k in forward:
+                    if k.selects(idx):
+                        child = merge_specs(child, spec_k)
+                if child is not None:
+                    result.append(self.read_pruned(child))
+                else:
+                    self.skip_value()
+                    if idx <= last:
+                        result.append(None)
+            return result
+        return self.read_scalar()
+
+    def skip_value(self):
+        """Skip the next value. Skipped containers are not validated."""
+        c = self.peek()
+        if c not in ('{', '['):
+            self.read_scalar()
+            return
+        depth = 0
+        while True:
+            match = STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    self.error('Unterminated value')
+                continue
+            c = match.group()
+            self.pos = match.start()
+            if c == '"':
+                self._skip_string()
+                continue
+            self.pos += 1
+            if c in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _skip_string(self):
+        while True:
+            match = STRING_TAIL.match(self.buf, self.pos + 1)
+            if match is not None:
+                self.pos = match.end()
+                return
+            if not self._fill():
+                self.error('Unterminated string')
+
+
+def _iter_chunks(source: tp.Any, chunk_size: int) -> tp.Iterator[tp.Union[str, bytes]]:
+    if isinstance(source, (str, bytes, bytearray)):
+        yield source
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def merge_specs(a: Spec, b: Spec) -> Spec:
+    if a is None:
+        return b
+    elif b is None:
+        return a
+    elif a is True or b is True:
+        return True
+    merged = dict(a)
+    for key, spec in b.items():
+        merged[key] = merge_specs(merged.get(key), spec)
+    return merged
+
+
+def _extract_spec(items: tp.Optional[dict]) -> Spec:
+    """Return the spec of the data read by the extracts at one path position."""
+    spec = None
+    for item in (items or {}).values():
+        if isinstance(item, tuple):
+            keys = item[:-1] if item and isinstance(item[-1], InlineQueryPlan) else item
+            child = True
+            for key in reversed(keys):
+                child = {key: child}
+            spec = merge_specs(spec, child)
+    return spec
+
+
+def _guard_spec(guard: tp.Callable[[tp.Any], bool]) -> Spec:
+    """Return the spec of the data read by `guard`, see `guards.guard_keys`."""
+    keys = guard_keys(guard)
+    if keys is None:
+        return True
+    return {key: True for key in keys}
+
+
+class StreamWalker:
+    """Walks a `JsonReader` along the path of a `QueryPlan`."""
+    def __init__(self, plan: QueryPlan):
+        self.plan = plan
+        path = plan.path
+        self.needs = [_extract_spec(plan.extracts.get(path[:i])) for i in range(len(path) + 1)]
+        self.specs = [None] * (len(path) + 1)
+        self.specs[-1] = self.needs[-1]
+        self.guards = [None] * (len(path) + 1)
+        for i in reversed(range(len(path))):
+            child_spec = self.specs[i + 1]
+            if is_wildcard(path[i]):
+                self.guards[i] = plan.guards.get(path[:i + 1])
+                if self.guards[i] is not None:
+                    child_spec = merge_specs(child_spec, _guard_spec(self.guards[i]))
+            self.specs[i] = merge_specs(self.needs[i], {path[i]: child_spec})
+        self.root_guard = plan.guards.get(())
+        self.root_spec = self.specs[0]
+        if self.root_guard is not None:
+            self.root_spec = merge_specs(self.root_spec, _guard_spec(self.root_guard))
+
+    def walk(self, reader: JsonReader, i: int, path: tp.Optional[tuple], values: list, errors: list):
+        """Process the next value in `reader` at position `i` of the plan path."""
+        plan = self.plan
+        need = self.needs[i]
+        segment = plan.path[i] if i < len(plan.path) else None
+        if segment is None or need is True or (need is not None and not isinstance(segment, str)) or not _streamable(segment):
+            data = reader.read_pruned(self.specs[i])
+            yield from plan._steps[i](data, path, values, errors)
+            return
+
+        extract = plan._extractors[i]
+        c = reader.peek()
+        if is_wildcard(segment) and (c == '[' or (c == '{' and segment == STAR)):
+            if extract is not None:
+                extract(None, path, values, errors)
+            keys = reader.iter_array() if c == '[' else reader.iter_object()
+            if segment != STAR:
+                keys = _selected(reader, keys, segment)
+            guard = self.guards[i]
+            if guard is None:
+                for key in keys:
+                    yield from self.walk(reader, i + 1, None if path is None else path + (key,), values, errors)
+                return
+            spec = self.specs[i][segment]
+            for key in keys:
+                # the guard needs the whole element, so it is read before descending
+                item = reader.read_pruned(spec)
+                if guard(item):
+                    yield from plan._steps[i + 1](item, None if path is None else path + (key,), values, errors)
+        elif isinstance(segment, int) and c == '[':
+            if extract is not None:
+                extract(None, path, values, errors)
+            for idx in reader.iter_array():
+                if idx == segment:
+                    yield from self.walk(reader, i + 1, None if path is None else path + (idx,), values, errors)
+                else:
+                    reader.skip_value()
+        elif isinstance(segment, str) and c == '{':
+            yield from self._walk_object(reader, i, segment, path, values, errors)
+        else:
+            reader.skip_value()
+
+    def _walk_object(self, reader: JsonReader, i: int, segment: str, path, values, errors):
+        plan = self.plan
+        need = self.needs[i] or {}
+        spec = self.specs[i]
+        pending = {key for key in need if isinstance(key, str)}
+        partial = {}
+        streamed = False
+        for key in reader.iter_object():
+            if key == segment and not pending and not streamed:
+                if plan._extractors[i] is not None:
+                    plan._extractors[i](partial, path, values, errors)
+                child_path = None if path is None else path + (key,)
+                yield from self.walk(reader, i + 1, child_path, values, errors)
+                streamed = True
+            elif key in spec and not streamed:
+                partial[key] = reader.read_pruned(spec[key])
+                pending.discard(key)
+            else:
+                reader.skip_value()
+        if not streamed:
+            yield from plan._steps[i](partial, path, values, errors)
+
+
+def _streamable(segment) -> bool:
+    """True if `segment` can be walked without knowing the length of arrays."""
+    if isinstance(segment, Slice):
+        return segment.is_forward()
+    return not isinstance(segment, int) or segment >= 0
+
+
+def _selected(reader: JsonReader, indices: tp.Iterator[int], segment: Slice) -> tp.Iterator[int]:
+    """Yield the `indices` selected by the forward slice `segment`, skipping the other elements."""
+    for idx in indices:
+        if segment.selects(idx):
+            yield idx
+        else:
+            reader.skip_value()
+
+
+def fill_stream(
+        plan: QueryPlan,
+        source: tp.Any,
+        values: list,
+        errors: list,
+        chunk_size: int = CHUNK_SIZE
+) -> tp.Generator[None, None, None]:
+    """Like `QueryPlan.fill`, but reads the document from JSON text."""
+    reader = JsonReader(source, chunk_size)
+    walker = StreamWalker(plan)
+    path = () if plan._track_path else None
+    if walker.root_guard is None:
+        yield from walker.walk(reader, 0, path, values, errors)
+    else:
+        yield from plan._run(reader.read_pruned(walker.root_spec), path, values, errors)
+    if reader.peek() != '':
+        reader.error('Extra data')
+
+
+def load_pruned(plans: tp.Iterable[QueryPlan], source: tp.Any, chunk_size: int = CHUNK_SIZE) -> tp.Any:
+    """Read a JSON document, keeping only the data required by any of `plans`."""
+    spec = None
+    for plan in plans:
+        spec = merge_specs(spec, StreamWalker(plan).root_spec)
+    reader = JsonReader(source, chunk_size)
+    data = reader.read_pruned(spec)
+    if reader.peek() != '':
+        reader.error('Extra data')
+    return data
+
+
+def execute_stream(
+        plan: QueryPlan,
+        source: tp.Any,
+        chunk_size: int = CHUNK_SIZE
+) -> tp.Generator[Row, None, None]:
+    """Like `QueryPlan.execute`, but reads the document from JSON text."""
+    names = plan.names
+    values = [None] * len(names)
+    errors = [None] * len(names)
+    for _ in fill_stream(plan, source, values, errors, chunk_size):
+        yield _make_row(names, values, errors)
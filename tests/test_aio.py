@@ -0,0 +1,114 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pytest
+
+from json_tabulator import tabulate, attribute
+
+
+QUERY = {'id': 'items[*].id', 'name': 'items[*].name'}
+DOCUMENTS = [
+    {'items': [{'id': 1, 'name': 'a'}, {'id': 2}]},
+    {'items': []},
+    {'items': [{'id': 3, 'name': 'c'}]},
+]
+
+
+async def agen(values):
+    for value in values:
+        await asyncio.sleep(0)
+        yield value
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+@pytest.mark.parametrize('make_source', [agen, list])
+def test_aget_rows(make_source):
+    query = tabulate(QUERY)
+    rows = asyncio.run(collect(query.aget_rows(make_source(DOCUMENTS))))
+    expected = list(query.get_rows_many(DOCUMENTS))
+    assert rows == expected
+    assert [row.errors.keys() for row in rows] == [row.errors.keys() for row in expected]
+
+
+def test_aget_rows_yields_to_loop():
+    query = tabulate({'x': '[*]'})
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        ticks.clear()
+        num_rows = 0
+        async for _ in query.aget_rows([list(range(1000))], yield_every=100):
+            num_rows += 1
+        task.cancel()
+        return num_rows
+
+    assert asyncio.run(main()) == 1000
+    assert len(ticks) >= 9
+
+
+def test_aget_rows_with_executor():
+    threads = set()
+
+    def convert(value):
+        threads.add(threading.current_thread())
+        return int(value)
+
+    query = tabulate({'x': attribute('[*]', converter=convert)})
+    with ThreadPoolExecutor(1) as executor:
+        rows = asyncio.run(collect(query.aget_rows(agen([['1', '2', 'x'], ['3']]), yield_every=2, executor=executor)))
+    assert rows == [{'x': 1}, {'x': 2}, {'x': None}, {'x': 3}]
+    assert 'x' in rows[2].errors
+    assert threading.main_thread() not in threads
+
+
+def test_aget_rows_from_json():
+    query = tabulate(QUERY)
+    text = json.dumps(DOCUMENTS[0]).encode()
+    chunks = [text[i:i + 5] for i in range(0, len(text), 5)]
+    rows = asyncio.run(collect(query.aget_rows_from_json(agen(chunks), yield_every=1)))
+    assert rows == list(query.get_rows(DOCUMENTS[0]))
+
+
+def test_aget_rows_from_json_sync_source():
+    query = tabulate(QUERY)
+    rows = asyncio.run(collect(query.aget_rows_from_json(json.dumps(DOCUMENTS[2]))))
+    assert rows == [{'id': 3, 'name': 'c'}]
+
+
+def test_aget_rows_from_json_stop_early():
+    query = tabulate({'x': '[*]'})
+    text = json.dumps(list(range(100)))
+
+    async def main():
+        async for row in query.aget_rows_from_json(agen([text[:50], text[50:]]), yield_every=10):
+            if row['x'] == 15:
+                return row
+
+    assert asyncio.run(main()) == {'x': 15}
+
+
+def test_aget_rows_from_json_invalid():
+    query = tabulate({'x': '[*]'})
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(collect(query.aget_rows_from_json(agen([b'[1, 2', b'}']))))
+
+
+def test_rejects_process_pool():
+    query = tabulate({'x': 'a[*]'})
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(TypeError):
+            query.aget_rows([{'a': [1, 2]}], executor=executor)
+        with pytest.raises(TypeError):
+            query.aget_rows_from_json('{"a": [1]}', executor=executor)
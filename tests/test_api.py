@@ -1,6 +1,11 @@
+import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from json_tabulator import tabulate, attribute
-from json_tabulator.exceptions import ConversionFailed
+from json_tabulator import tabulate, tabulate_many, attribute, api, guards, TupleRow
+from json_tabulator.converters import to_int, from_scalar
+from json_tabulator.expression import STAR
+from json_tabulator.exceptions import ConversionFailed, AttributeNotFound, IncompatiblePaths
 
 
 class Test_tabulate_api:
@@ -106,3 +111,477 @@ class Test_default:
     def test_cannot_specify_default_and_default_factory(self):
         with pytest.raises(ValueError):
             attribute('$.a', default=1, default_factory=lambda: 1)
+
+
+class Test_get_rows_many:
+    def test_returns_rows_of_all_documents(self):
+        query = tabulate({'a': attribute('$[*].a', converter=int)})
+        documents = [[{'a': '1'}, {'a': '2'}], [], [{'a': '3'}]]
+        actual = list(query.get_rows_many(documents))
+        assert actual == [{'a': 1}, {'a': 2}, {'a': 3}]
+
+    def test_with_ordinal(self):
+        query = tabulate({'a': '$[*].a'})
+        documents = iter([[{'a': 1}, {}], [], [{'a': 3}]])
+        actual = list(query.get_rows_many(documents, with_ordinal=True))
+        assert actual == [(0, {'a': 1}), (0, {'a': None}), (2, {'a': 3})]
+        assert set(actual[1][1].errors.keys()) == {'a'}
+
+
+class Test_batch_converter:
+    def test_applies_batch_converter(self):
+        query = tabulate({'a': attribute('$[*].a', batch_converter=to_int, default=0)})
+        data = [{'a': '1'}, {}, {'a': None}, {'a': 'x'}]
+        rows = list(query.get_rows(data))
+        assert rows == [{'a': 1}, {'a': 0}, {'a': 0}, {'a': None}]
+        assert rows[0].errors == {}
+        assert isinstance(rows[3].errors['a'], ConversionFailed)
+        assert rows[3].errors['a'].value == 'x'
+        assert isinstance(rows[3].errors['a'].caused_by, ValueError)
+
+    def test_converts_in_chunks(self, monkeypatch):
+        monkeypatch.setattr(api, 'CONVERSION_BATCH_SIZE', 2)
+        calls = []
+
+        def convert(values):
+            calls.append(values)
+            return to_int(values)
+
+        query = tabulate({'a': attribute('$[*].a', batch_converter=convert)})
+        rows = list(query.get_rows_many([[{'a': '1'}, {'a': '2'}], [{'a': '3'}]], with_ordinal=True))
+        assert rows == [(0, {'a': 1}), (0, {'a': 2}), (1, {'a': 3})]
+        assert calls == [['1', '2'], ['3']]
+
+    def test_get_columns(self):
+        query = tabulate({'a': attribute('$[*].a', batch_converter=to_int, default_factory=lambda: -1)})
+        columns = query.get_columns([{'a': '1'}, {}, {'a': 'x'}])
+        assert columns['a'] == [1, -1, None]
+        assert set(columns.errors['a']) == {1, 2}
+        assert isinstance(columns.errors['a'][2], ConversionFailed)
+
+    def test_cannot_specify_converter_and_batch_converter(self):
+        with pytest.raises(ValueError):
+            attribute('$.a', converter=int, batch_converter=to_int)
+
+
+def test_creates_one_row_object_per_row(monkeypatch):
+    created = []
+
+    class CountingRow(api.Row):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(api, 'Row', CountingRow)
+    query = tabulate({'id': 'id', 'x': attribute('a[*].x', converter=int, default=0)})
+    rows = list(query.get_rows({'id': 1, 'a': [{'x': '1'}, {}]}))
+    assert rows == [{'id': 1, 'x': 1}, {'id': 1, 'x': 0}]
+    assert created == rows
+
+
+class Test_errors_mode:
+    data = [{'a': '1', 'b': 'x'}, {'b': '2'}]
+
+    def make_query(self, errors):
+        return tabulate({
+            'a': '$[*].a',
+            'b': attribute('$[*].b', converter=int),
+        }, errors=errors)
+
+    def test_collect(self):
+        rows = list(self.make_query('collect').get_rows(self.data))
+        assert set(rows[0].errors) == {'b'}
+        assert set(rows[1].errors) == {'a'}
+
+    def test_ignore(self):
+        rows = list(self.make_query('ignore').get_rows(self.data))
+        assert rows == [{'a': '1', 'b': None}, {'a': None, 'b': 2}]
+        assert all(row.errors == {} for row in rows)
+        columns = self.make_query('ignore').get_columns(self.data)
+        assert columns.errors == {'a': {}, 'b': {}}
+
+    @pytest.mark.parametrize('data, error', [
+        ([{'a': '1', 'b': 'x'}], ConversionFailed),
+        ([{'b': '2'}], AttributeNotFound),
+    ])
+    def test_raise(self, data, error):
+        query = self.make_query('raise')
+        with pytest.raises(error):
+            list(query.get_rows(data))
+        with pytest.raises(error):
+            query.get_columns(data)
+
+    def test_raise_with_batch_converter(self):
+        query = tabulate({'a': attribute('$[*].a', batch_converter=to_int)}, errors='raise')
+        with pytest.raises(ConversionFailed):
+            list(query.get_rows([{'a': 'x'}]))
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            tabulate({'a': '$.a'}, errors='unknown')
+
+
+class Test_row_type:
+    data = [{'a': '1', 'b': 'x'}, {'b': '2'}]
+
+    def make_query(self, row_type, **kwargs):
+        return tabulate({
+            'a': '$[*].a',
+            'b': attribute('$[*].b', **(kwargs or {'converter': int})),
+        }, row_type=row_type)
+
+    def test_tuple(self):
+        rows = list(self.make_query('tuple').get_rows(self.data))
+        assert rows == [('1', None), (None, 2)]
+        assert all(isinstance(row, TupleRow) for row in rows)
+        assert isinstance(rows[0].errors['b'], ConversionFailed)
+        assert isinstance(rows[1].errors['a'], AttributeNotFound)
+
+    def test_namedtuple(self):
+        rows = list(self.make_query('namedtuple').get_rows(self.data))
+        assert rows[1].a is None and rows[1].b == 2
+        assert rows[1]._asdict() == {'a': None, 'b': 2}
+        assert set(rows[1].errors) == {'a'}
+
+    def test_namedtuple_renames_invalid_fields(self):
+        query = tabulate({'a b': '$.x', 'class': '$.y'}, row_type='namedtuple')
+        row, = query.get_rows({'x': 1, 'y': 2})
+        assert row == (1, 2)
+        assert row._fields == ('_0', '_1')
+
+    @pytest.mark.parametrize('row_type', ['tuple', 'namedtuple'])
+    def test_batch_converter(self, row_type):
+        query = self.make_query(row_type, batch_converter=to_int)
+        rows = list(query.get_rows(self.data))
+        assert rows == [('1', None), (None, 2)]
+        assert type(rows[0]) is type(rows[1])
+        assert set(rows[0].errors) == {'b'}
+
+    @pytest.mark.parametrize('row_type', ['tuple', 'namedtuple'])
+    def test_pickle(self, row_type):
+        rows = list(self.make_query(row_type).get_rows(self.data))
+        restored = pickle.loads(pickle.dumps(rows))
+        assert restored == rows
+        assert [type(row) for row in restored] == [type(row) for row in rows]
+        assert set(restored[0].errors) == {'b'}
+
+    def test_rows_without_errors_have_no_instance_dict(self):
+        row, = tabulate({'a': '$.a'}, row_type='tuple').get_rows({'a': 1})
+        assert '_errors' not in vars(row)
+        assert row.errors == {}
+
+    def test_invalid_row_type(self):
+        with pytest.raises(ValueError):
+            tabulate({'a': '$.a'}, row_type='list')
+
+
+class Test_guards:
+    data = {'events': [
+        {'type': 'click', 'x': 1, 'items': [{'id': 1}, {'id': 2}]},
+        {'type': 'view', 'items': [{'id': 3}]},
+        'garbage',
+        {'type': 'click', 'x': 2},
+    ]}
+
+    def test_skips_rejected_elements(self):
+        query = tabulate({'x': 'events[*].x', 'i': 'events[*].(index)'}, guards={
+            'events[*]': guards.field_in('type', 'click'),
+        })
+        assert list(query.get_rows(self.data)) == [{'x': 1, 'i': 0}, {'x': 2, 'i': 3}]
+
+    def test_guard_on_inner_wildcard(self):
+        query = tabulate({'id': 'events[*].items[*].id'}, guards={
+            'events[*]': guards.is_type(dict),
+            '$.events[*].items[*]': lambda item: item['id'] != 2,
+        })
+        assert list(query.get_rows(self.data)) == [{'id': 1}, {'id': 3}]
+
+    def test_guard_is_not_called_for_skipped_subtrees(self):
+        calls = []
+
+        def guard(item):
+            calls.append(item)
+            return True
+
+        query = tabulate({'id': 'events[*].items[*].id'}, guards={
+            'events[*]': guards.has_keys('x', 'items'),
+            'events[*].items[*]': guard,
+        })
+        assert list(query.get_rows(self.data)) == [{'id': 1}, {'id': 2}]
+        assert calls == [{'id': 1}, {'id': 2}]
+
+    @pytest.mark.parametrize('path', ['events', 'events[*].items[*]', 'other[*]'])
+    def test_fails_for_path_that_is_not_a_wildcard_of_the_query(self, path):
+        with pytest.raises(IncompatiblePaths):
+            tabulate({'x': 'events[*].x'}, guards={path: guards.is_type(dict)})
+
+    def test_guards_are_part_of_the_cache_key(self):
+        data = [{'a': 1}, {'b': 2}]
+        unguarded = tabulate({'a': '$[*].a'})
+        guarded = tabulate({'a': '$[*].a'}, guards={'$[*]': guards.has_keys('a')})
+        assert len(list(unguarded.get_rows(data))) == 2
+        assert len(list(guarded.get_rows(data))) == 1
+
+    def test_plan_with_guards_can_be_pickled(self):
+        query = tabulate({'x': 'events[*].x'}, guards={'events[*]': guards.field_in('type', 'view')})
+        restored = pickle.loads(pickle.dumps(query))
+        assert list(restored.get_rows(self.data)) == [{'x': None}]
+
+
+class Test_where:
+    data = {'kind': 'log', 'events': [
+        {'type': 'click', 'n': 1, 'items': [{'v': 1}, {'v': 5}]},
+        {'type': 'view', 'n': 2, 'items': [{'v': 7}]},
+        {'type': 'click', 'items': [{'v': 9}]},
+    ]}
+    query = {'n': 'events[*].n', 'v': 'events[*].items[*].v'}
+
+    def test_filters_rows(self):
+        query = tabulate(self.query, where=[('events[*].items[*].v', '>', 4)])
+        assert list(query.get_rows(self.data)) == [{'n': 1, 'v': 5}, {'n': 2, 'v': 7}, {'n': None, 'v': 9}]
+
+    def test_conditions_are_combined_with_and(self):
+        query = tabulate(self.query, where=[
+            ('events[*].type', '==', 'click'),
+            ('events[*].items[*].v', 'in', [1, 9]),
+        ])
+        assert list(query.get_rows(self.data)) == [{'n': 1, 'v': 1}, {'n': None, 'v': 9}]
+
+    def test_prunes_at_the_table_of_the_condition(self):
+        query = tabulate(self.query, where=[('events[*].type', '!=', 'click')])
+        assert list(query.get_rows(self.data)) == [{'n': 2, 'v': 7}]
+        assert query._plan.guards.keys() == {('events', STAR)}
+
+    def test_missing_and_incomparable_values_are_dropped(self):
+        query = tabulate(self.query, where=[('events[*].n', '<', 2)])
+        assert list(query.get_rows(self.data)) == [{'n': 1, 'v': 1}, {'n': 1, 'v': 5}]
+        query = tabulate(self.query, where=[('events[*].type', '<', 2)])
+        assert list(query.get_rows(self.data)) == []
+
+    def test_condition_on_document(self):
+        query = tabulate(self.query, where=[('kind', '==', 'metrics')])
+        assert list(query.get_rows(self.data)) == []
+        documents = [self.data, {**self.data, 'kind': 'metrics'}]
+        assert [ordinal for ordinal, _ in query.get_rows_many(documents, with_ordinal=True)] == [1] * 4
+
+    def test_where_and_guard_on_same_wildcard(self):
+        query = tabulate(
+            self.query,
+            guards={'events[*]': guards.has_keys('n')},
+            where=[('events[*].type', '==', 'click')]
+        )
+        assert list(query.get_rows(self.data)) == [{'n': 1, 'v': 1}, {'n': 1, 'v': 5}]
+
+    @pytest.mark.parametrize('where, error', [
+        ([('events[*].x', '=', 1)], ValueError),
+        ([('events[*].(index)', '==', 1)], ValueError),
+        ([('other[*].x', '==', 1)], IncompatiblePaths),
+        ([('events[*].items[*].x[*]', '==', 1)], IncompatiblePaths),
+    ])
+    def test_invalid_conditions(self, where, error):
+        with pytest.raises(error):
+            tabulate(self.query, where=where)
+
+
+class Test_limit_and_count:
+    data = Test_where.data
+    query = Test_where.query
+
+    @pytest.mark.parametrize('limit', [0, 1, 3, 10])
+    def test_limit(self, limit):
+        query = tabulate(self.query)
+        assert list(query.get_rows(self.data, limit=limit)) == list(query.get_rows(self.data))[:limit]
+
+    def test_limit_stops_traversal(self):
+        visited, converted = [], []
+
+        def visit(value):
+            visited.append(value)
+            return True
+        query = tabulate(
+            {'v': attribute('[*]', batch_converter=from_scalar(converted.append))},
+            guards={'[*]': visit}
+        )
+        assert len(list(query.get_rows(list(range(10_000)), limit=2))) == 2
+        assert visited == converted == [0, 1]
+
+    def test_limit_many_and_stats(self):
+        reports = []
+        query = tabulate(self.query)
+        rows = list(query.get_rows_many([self.data, self.data], with_ordinal=True, stats=reports.append, limit=6))
+        assert rows == list(query.get_rows_many([self.data, self.data], with_ordinal=True))[:6]
+        assert reports[0]['rows'] == 6
+        assert list(query.get_rows(self.data, stats=reports.append, limit=1)) == [{'n': 1, 'v': 1}]
+
+    def test_invalid_limit(self):
+        with pytest.raises(ValueError):
+            tabulate(self.query).get_rows(self.data, limit=-1)
+
+    @pytest.mark.parametrize('kwargs', [
+        {},
+        {'where': [('events[*].items[*].v', '>', 4)]},
+        {'guards': {'events[*]': guards.has_keys('n')}},
+        {'where': [('kind', '==', 'metrics')]},
+    ])
+    def test_count_rows(self, kwargs):
+        query = tabulate(self.query, **kwargs)
+        assert query.count_rows(self.data) == len(list(query.get_rows(self.data)))
+
+    @pytest.mark.parametrize('query, data, count', [
+        ({'a': 'a'}, {}, 1),
+        ({'a': 'x[*].a'}, {'x': 1}, 0),
+        ({'a': 'x[1].y[*]'}, {'x': [0, {'y': [1, 2]}]}, 2),
+        ({'a': '$.*.(index)'}, {'p': 1, 'q': 2}, 2),
+    ])
+    def test_count_rows_edge_cases(self, query, data, count):
+        query = tabulate(query)
+        assert query.count_rows(data) == count == len(list(query.get_rows(data)))
+
+
+class Test_tabulate_many:
+    data = {
+        'customer': 'c1',
+        'orders': [
+            {'id': 1, 'items': [{'sku': 'a', 'qty': '2'}, {'sku': 'b', 'qty': '1'}], 'payments': [{'amount': 5}]},
+            {'id': 2, 'items': [{'sku': 'c', 'qty': 'x'}], 'payments': []},
+            'invalid',
+        ],
+        'notes': {'first': 'hello', 'second': 'world'},
+    }
+    tables = {
+        'orders': {'customer': 'customer', 'order': 'orders[*].id', 'index': 'orders[*].(index)'},
+        'items': {'order': 'orders[*].id', 'sku': 'orders[*].items[*].sku', 'qty': attribute('orders[*].items[*].qty', converter=int)},
+        'payments': {'order': 'orders[*].id', 'amount': 'orders[*].payments[*].amount'},
+        'notes': {'key': 'notes.*.(path)', 'text': 'notes.*'},
+    }
+
+    def expected(self):
+        return {name: list(tabulate(query).get_rows(self.data)) for name, query in self.tables.items()}
+
+    def test_get_tables_matches_separate_queries(self):
+        tables = tabulate_many(self.tables).get_tables(self.data)
+        expected = self.expected()
+        assert tables == expected
+        assert [r.errors.keys() for r in tables['items']] == [r.errors.keys() for r in expected['items']]
+
+    def test_get_rows_yields_tagged_rows_in_document_order(self):
+        rows = list(tabulate_many(self.tables).get_rows(self.data))
+        assert [table for table, _ in rows] == [
+            'orders', 'items', 'items', 'payments', 'orders', 'items', 'orders', 'notes', 'notes',
+        ]
+        tables = {name: [row for table, row in rows if table == name] for name in self.tables}
+        assert tables == self.expected()
+
+    def test_get_rows_many(self):
+        documents = [self.data, {'orders': [{'id': 3}]}]
+        rows = list(tabulate_many(self.tables).get_rows_many(documents))
+        assert rows[:-1] == list(tabulate_many(self.tables).get_rows(self.data))
+        assert rows[-1] == ('orders', {'customer': None, 'order': 3, 'index': 0})
+
+    def test_get_rows_from_json(self):
+        multi = tabulate_many(self.tables)
+        rows = list(multi.get_rows_from_json(json.dumps(self.data), chunk_size=5))
+        assert rows == list(multi.get_rows(self.data))
+
+    def test_get_rows_from_json_presence_only_wildcards(self):
+        multi = tabulate_many({'t': {'i': 'a[*].(index)'}, 'u': {'p': 'b.*.(path)'}})
+        data = {'a': [10, 20], 'b': {'k': {}}}
+        rows = list(multi.get_rows_from_json(json.dumps(data)))
+        assert rows == list(multi.get_rows(data)) == [('t', {'i': 0}), ('t', {'i': 1}), ('u', {'p': '$.b.k'})]
+
+    def test_visits_shared_parts_once(self):
+        class CountingList(list):
+            iterations = 0
+
+            def __iter__(self):
+                CountingList.iterations += 1
+                return super().__iter__()
+
+        data = {**self.data, 'orders': CountingList(self.data['orders'])}
+        tabulate_many(self.tables).get_tables(data)
+        assert CountingList.iterations == 1
+
+    def test_guards_and_conditions_apply_per_table(self):
+        multi = tabulate_many({
+            'click': tabulate({'x': '$[*].x'}, where=[('$[*].type', '==', 'click')]),
+            'view': tabulate({'x': '$[*].x'}, guards={'$[*]': guards.field_in('type', 'view')}),
+            'all': {'x': '$[*].x'},
+            'first': tabulate({'x': '$[*].x'}, where=[('$[0].type', '==', 'other')]),
+        })
+        data = [{'type': 'click', 'x': 1}, {'type': 'view', 'x': 2}]
+        assert multi.get_tables(data) == {
+            'click': [{'x': 1}],
+            'view': [{'x': 2}],
+            'all': [{'x': 1}, {'x': 2}],
+            'first': [],
+        }
+
+    def test_batch_converters(self):
+        multi = tabulate_many({
+            'a': {'a': attribute('$[*].a', batch_converter=to_int)},
+            'b': {'b': '$[*].b'},
+        }, row_type='tuple')
+        data = [{'a': '1', 'b': 2}, {'a': 'x'}]
+        assert multi.get_tables(data) == {'a': [(1,), (None,)], 'b': [(2,), (None,)]}
+        rows = list(multi.get_rows(data))
+        assert rows == [('b', (2,)), ('b', (None,)), ('a', (1,)), ('a', (None,))]
+        assert set(rows[3][1].errors) == {'a'}
+
+
+class Test_slices:
+    data = {'id': 'doc', 'a': [{'x': i, 'b': list(range(i))} for i in range(6)]}
+
+    def expected(self, selection, inner=slice(None)):
+        a = self.data['a']
+        return [
+            {'id': 'doc', 'i': i, 'x': a[i]['x'], 'b': b, 'p': f'$.a[{i}].b[{j}]'}
+            for i in range(len(a))[selection]
+            for j, b in zip(range(len(a[i]['b']))[inner], a[i]['b'][inner])
+        ]
+
+    def run_all(self, query, data, **kwargs):
+        """Return the rows of `query` from all execution paths, which must agree."""
+        query = tabulate(query, **kwargs)
+        rows = list(query.get_rows(data))
+        assert list(query.get_rows_from_json(json.dumps(data), chunk_size=7)) == rows
+        assert [row for _, row in tabulate_many({'t': query}).get_rows(data)] == rows
+        with ThreadPoolExecutor(2) as executor:
+            assert list(query.get_rows(data, workers=2, executor=executor)) == rows
+        assert query.count_rows(data) == len(rows)
+        return rows
+
+    @pytest.mark.parametrize('text, selection, inner', [
+        ('[1:4]', slice(1, 4), slice(None)),
+        ('[-2:]', slice(-2, None), slice(None)),
+        ('[::2]', slice(None, None, 2), slice(-1, None)),
+        ('[::-1]', slice(None, None, -1), slice(None, 2)),
+        ('[10:]', slice(10, None), slice(None)),
+        ('[:]', slice(None), slice(1, -1)),
+    ])
+    def test_slices(self, text, selection, inner):
+        b = f'a{text}.b[{inner.start or ""}:{inner.stop or ""}]'
+        query = {'id': 'id', 'i': f'a{text}.(index)', 'x': f'a{text}.x', 'b': b, 'p': b + '.(path)'}
+        assert self.run_all(query, self.data) == self.expected(selection, inner)
+
+    def test_negative_index(self):
+        query = {'x': 'a[-1].x', 'last': 'a[-1].b[-1]', 'b': 'a[-2].b[*]', 'p': 'a[-2].b[*].(path)'}
+        rows = self.run_all(query, self.data)
+        assert rows == [{'x': 5, 'last': 4, 'b': j, 'p': f'$.a[4].b[{j}]'} for j in range(4)]
+
+    def test_negative_index_out_of_range(self):
+        rows = self.run_all({'x': 'a[-7].x', 'y': 'a[*].b[-1]'}, self.data)
+        assert [row['y'] for row in rows] == [None, 0, 1, 2, 3, 4]
+        assert rows[0].errors.keys() == {'x', 'y'}
+        assert self.run_all({'x': 'a[-7].b[*]'}, self.data) == []
+
+    def test_slice_of_dict_has_no_rows(self):
+        assert self.run_all({'v': '$[0:2]'}, {'x': 1, 'y': 2}) == []
+
+    def test_guards_and_where(self):
+        query = {'x': 'a[1:].x'}
+        rows = self.run_all(query, self.data, guards={'a[1:]': guards.has_keys('b')}, where=[('a[1:].x', '<', 4)])
+        assert rows == [{'x': 1}, {'x': 2}, {'x': 3}]
+
+    def test_inline(self):
+        rows = self.run_all({'tail': 'a[-1].(inline b[2:])', 'rev': 'a[-1].(inline b[::-2])'}, self.data)
+        assert rows == [{'tail': [2, 3, 4], 'rev': [4, 2, 0]}]
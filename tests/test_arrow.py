@@ -0,0 +1,76 @@
+import pytest
+from json_tabulator import tabulate, attribute, arrow
+
+pa = pytest.importorskip('pyarrow')
+
+
+DOCUMENTS = [
+    {'id': 'a', 'items': [{'x': '1'}, {'x': 'abc'}, {}]},
+    {'id': 'b', 'items': [{'x': '4'}]},
+]
+
+
+@pytest.fixture
+def query():
+    return tabulate({
+        'id': 'id',
+        'x': attribute('items[*].x', converter=int, dtype=pa.int32()),
+    })
+
+
+def test_get_record_batches(query):
+    batches = list(query.get_record_batches(DOCUMENTS, batch_size=3))
+    assert [b.num_rows for b in batches] == [3, 1]
+    table = pa.Table.from_batches(batches)
+    assert table.schema.field('x').type == pa.int32()
+    assert table.column('id').to_pylist() == ['a', 'a', 'a', 'b']
+    assert table.column('x').to_pylist() == [1, None, None, 4]
+    assert table.column('errors').to_pylist() == [
+        {'id': False, 'x': False},
+        {'id': False, 'x': True},
+        {'id': False, 'x': True},
+        {'id': False, 'x': False},
+    ]
+
+
+def test_get_record_batches_without_errors(query):
+    batch, = query.get_record_batches(DOCUMENTS, errors_column=None)
+    assert batch.schema.names == ['id', 'x']
+
+
+def test_get_record_batches_without_rows(query):
+    batch, = query.get_record_batches([])
+    assert batch.num_rows == 0
+    assert batch.schema.names == ['id', 'x', 'errors']
+
+
+def test_write_parquet(query, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'out.parquet'
+    assert query.write_parquet(DOCUMENTS, path, batch_size=2) == 4
+    table = pq.read_table(path)
+    assert table.column('x').to_pylist() == [1, None, None, 4]
+
+
+def test_write_parquet_sparse_first_batch(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'out.parquet'
+    query = tabulate({'x': '$[*].x', 'y': '$[*].y'})
+    documents = [[{'y': 1}] * 3, [{'x': 5}] * 3, [{'x': 6, 'y': None}]]
+    assert query.write_parquet(documents, path, batch_size=3) == 7
+    table = pq.read_table(path)
+    assert table.column('x').to_pylist() == [None] * 3 + [5, 5, 5, 6]
+    assert table.schema.field('x').type == pa.int64()
+    assert table.schema.field('y').type == pa.int64()
+
+
+def test_write_parquet_column_without_values(tmp_path, monkeypatch):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'out.parquet'
+    query = tabulate({'x': '$[*].x'})
+    assert query.write_parquet([[{}] * 5], path, batch_size=2) == 5
+    assert pq.read_table(path).column('x').to_pylist() == [None] * 5
+
+    monkeypatch.setattr(arrow, 'MAX_PENDING_BATCHES', 2)
+    with pytest.raises(ValueError, match='dtype'):
+        query.write_parquet([[{}] * 4, [{'x': 1}]], path, batch_size=2)
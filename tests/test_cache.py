@@ -0,0 +1,98 @@
+import io
+import pytest
+from json_tabulator import tabulate, cache
+from json_tabulator.parser import parse_expression
+from json_tabulator.exceptions import InvalidExpression, IncompatiblePaths
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class Test_LRUCache:
+    def test_hits_and_misses(self):
+        c = cache.LRUCache(2)
+        assert c.get('a', lambda: 1) == 1
+        assert c.get('a', lambda: 2) == 1
+        assert c.info() == cache.CacheInfo(hits=1, misses=1, evictions=0, maxsize=2, currsize=1)
+
+    def test_evicts_least_recently_used(self):
+        c = cache.LRUCache(2)
+        c.get('a', lambda: 1)
+        c.get('b', lambda: 2)
+        c.get('a', lambda: 1)
+        c.get('c', lambda: 3)
+        assert [key for key, _ in c.items()] == ['a', 'c']
+        assert c.info().evictions == 1
+
+    def test_resize(self):
+        c = cache.LRUCache(3)
+        for key in 'abc':
+            c.get(key, lambda: key)
+        c.resize(1)
+        assert c.items() == [('c', 'c')]
+
+    def test_size_zero_disables_cache(self):
+        c = cache.LRUCache(0)
+        c.get('a', lambda: 1)
+        assert len(c) == 0
+
+    def test_does_not_cache_exceptions(self):
+        c = cache.LRUCache(2)
+
+        def fail():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            c.get('a', fail)
+        assert len(c) == 0
+
+
+def test_unhashable_keys_are_not_cached():
+    c = cache.LRUCache(2)
+    assert c.get(([],), lambda: 1) == 1
+    assert len(c) == 0 and c.info().misses == 1
+
+
+def test_parse_expression_is_cached():
+    assert parse_expression('$.a[*]') is parse_expression('$.a[*]')
+    assert cache.expressions.info().hits == 1
+
+
+def test_invalid_expression_is_not_cached():
+    for _ in range(2):
+        with pytest.raises(InvalidExpression):
+            parse_expression('$.a.')
+    assert len(cache.expressions) == 0
+
+
+def test_tabulate_shares_plans_for_equivalent_queries():
+    a = tabulate({'x': '$.a[*].b'})
+    b = tabulate({'x': '$["a"][*]."b"'})
+    c = tabulate({'x': '$.a[*].b'}, errors='ignore')
+    assert a._plan is b._plan
+    assert c._plan is not a._plan
+    assert list(b.get_rows({'a': [{'b': 1}]})) == [{'x': 1}]
+
+
+def test_incompatible_paths_are_not_cached():
+    with pytest.raises(IncompatiblePaths):
+        tabulate({'x': '$.a[*]', 'y': '$.b[*]'})
+    assert len(cache.plans) == 0
+
+
+def test_dump_and_load():
+    cache.preload([{'x': '$.a[*].b', 'y': '$.c'}])
+    f = io.BytesIO()
+    cache.dump(f)
+    cache.clear()
+    f.seek(0)
+    cache.load(f)
+    assert cache.cache_info()['plans'].currsize == 1
+    query = tabulate({'x': '$.a[*].b', 'y': '$.c'})
+    assert cache.cache_info()['plans'].hits == 1
+    assert cache.cache_info()['expressions'].misses == 0
+    assert list(query.get_rows({'a': [{'b': 1}], 'c': 2})) == [{'x': 1, 'y': 2}]
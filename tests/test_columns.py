@@ -0,0 +1,66 @@
+import array
+import pytest
+from json_tabulator import tabulate, attribute, Columns
+from json_tabulator.columns import to_buffer
+from json_tabulator.exceptions import AttributeNotFound, ConversionFailed
+
+
+def test_get_columns():
+    query = tabulate({'id': 'id', 'x': 'a[*].x'})
+    data = {'id': 'doc', 'a': [{'x': 1}, {}, {'x': None}]}
+    actual = query.get_columns(data)
+    assert isinstance(actual, Columns)
+    assert actual == {'id': ['doc', 'doc', 'doc'], 'x': [1, None, None]}
+    assert actual.num_rows == 3
+    assert actual.nulls == {'id': bytearray([0, 0, 0]), 'x': bytearray([0, 1, 1])}
+    assert actual.errors['id'] == {}
+    assert set(actual.errors['x']) == {1}
+    assert isinstance(actual.errors['x'][1], AttributeNotFound)
+
+
+def test_get_columns_without_rows():
+    query = tabulate({'x': 'a[*].x'})
+    actual = query.get_columns({})
+    assert actual == {'x': []}
+    assert actual.num_rows == 0
+
+
+def test_get_columns_applies_converters_and_defaults():
+    query = tabulate({
+        'id': attribute('id', converter=str.upper),
+        'x': attribute('a[*].x', converter=int, default=-1),
+    })
+    data = {'id': 'doc', 'a': [{'x': '1'}, {}, {'x': 'abc'}]}
+    actual = query.get_columns(data)
+    assert actual == {'id': ['DOC'] * 3, 'x': [1, -1, None]}
+    assert isinstance(actual.errors['x'][1], AttributeNotFound)
+    assert isinstance(actual.errors['x'][2], ConversionFailed)
+    assert actual.nulls['x'] == bytearray([0, 0, 1])
+
+
+def test_get_columns_with_array_dtype():
+    query = tabulate({'x': attribute('[*].x', dtype='d')})
+    actual = query.get_columns([{'x': 1.5}, {}])
+    assert actual['x'] == array.array('d', [1.5, 0.0])
+    assert actual.nulls['x'] == bytearray([0, 1])
+
+
+def test_get_columns_with_numpy_dtype():
+    np = pytest.importorskip('numpy')
+    query = tabulate({'x': attribute('[*].x', dtype='int32')})
+    actual = query.get_columns([{'x': 1}, {}])
+    assert actual['x'].dtype == np.int32
+    assert actual['x'].tolist() == [1, 0]
+
+
+def test_get_columns_with_object_dtype_keeps_none():
+    pytest.importorskip('numpy')
+    query = tabulate({'x': attribute('[*].x', dtype=object)})
+    actual = query.get_columns([{'x': 'a'}, {}])
+    assert actual['x'].tolist() == ['a', None]
+    assert actual.nulls['x'] == bytearray([0, 1])
+
+
+def test_to_buffer_returns_list_without_dtype():
+    values = [1, None]
+    assert to_buffer(values) is values
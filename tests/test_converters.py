@@ -0,0 +1,40 @@
+import datetime as dt
+import pickle
+import pytest
+from json_tabulator.converters import to_int, to_float, to_bool, to_datetime, from_scalar
+
+
+@pytest.mark.parametrize('converter, values, expected', [
+    (to_int, ['1', 2, 3.5], [1, 2, 3]),
+    (to_float, ['1.5', 2], [1.5, 2.0]),
+    (to_bool, [True, 'false', '1', 0], [True, False, True, False]),
+    (to_datetime(), ['2024-01-02T03:04:05'], [dt.datetime(2024, 1, 2, 3, 4, 5)]),
+    (to_datetime('%d.%m.%Y'), ['02.01.2024'], [dt.datetime(2024, 1, 2)]),
+])
+def test_converts_values(converter, values, expected):
+    converted, failed = converter(values)
+    assert list(converted) == expected
+    assert not any(failed)
+
+
+@pytest.mark.parametrize('converter, values', [
+    (to_int, ['1', 'x', '3']),
+    (to_float, ['1', 'x', '3']),
+    (to_bool, ['1', 'x', '0']),
+    (to_datetime(), ['2024-01-01', 'x', '2024-01-03']),
+])
+def test_reports_failures(converter, values):
+    converted, failed = converter(values)
+    assert [bool(f) for f in failed] == [False, True, False]
+    assert isinstance(failed[1], ValueError)
+    assert converted[1] is None
+
+
+def test_empty():
+    assert to_int([]) == ([], [])
+
+
+def test_converters_are_picklable():
+    converter = pickle.loads(pickle.dumps(to_datetime('%Y')))
+    assert converter(['2024'])[0] == [dt.datetime(2024, 1, 1)]
+    assert pickle.loads(pickle.dumps(from_scalar(int)))(['1'])[0] == [1]
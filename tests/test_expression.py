@@ -1,12 +1,14 @@
 import pytest
-from json_tabulator.expression import expression, STAR, INDEX, PATH, Inline
+from json_tabulator.expression import expression, STAR, INDEX, PATH, Inline, Slice
 
 
 @pytest.mark.parametrize('path,expected', [
     [('a', 'b'), True],
     [('a', STAR, 'b'), False],
     [('a', 0, 'b'), True],
-    [('a', 0, 'b', STAR), False]
+    [('a', 0, 'b', STAR), False],
+    [('a', Slice(1), 'b'), False],
+    [('a', -1, 'b'), True],
 ])
 def test_is_concrete(path: tuple, expected: bool):
     """
@@ -39,6 +41,8 @@ def test_coincides_with(this: tuple, other: tuple, expected: bool):
     [('a', 'b'), ()],
     [('a', STAR, INDEX), ('a', STAR)],
     [('a', 1), ()],
+    [('a', STAR, 'b', Slice(0, 2), 'c'), ('a', STAR, 'b', Slice(0, 2))],
+    [('a', Slice(-1), INDEX), ('a', Slice(-1))],
 ])
 def test_get_table(path: tuple, expected: tuple):
     """
@@ -51,7 +55,7 @@ def test_get_table(path: tuple, expected: tuple):
 
 
 
-@pytest.mark.parametrize('obj', [STAR])
+@pytest.mark.parametrize('obj', [STAR, Slice(1, None, 2)])
 def test_Segments_are_hashable(obj):
     hash(obj)  # does not raise
 
@@ -65,6 +69,10 @@ def test_Segments_are_hashable(obj):
     ['.', '$."."'],
     ['a.b.c', '$."a.b.c"'],
     [1, '$[1]'],
+    [('a', -1), '$.a[-1]'],
+    [('a', Slice(1, -1)), '$.a[1:-1]'],
+    [('a', Slice(None, None, -2), INDEX), '$.a[::-2].(index)'],
+    [Slice(), '$[:]'],
     [(STAR, INDEX), '$[*].(index)'],
     [(STAR, PATH), '$[*].(path)'],
     [('a', Inline(expression(STAR, 'b'))), '$.a.(inline [*].b)'],
@@ -74,6 +82,19 @@ def test_expression_path_string(path, expected):
     assert actual == expected
 
 
+@pytest.mark.parametrize('segment, length, indices', [
+    [Slice(1, 3), 5, [1, 2]],
+    [Slice(-2), 5, [3, 4]],
+    [Slice(None, None, -2), 5, [4, 2, 0]],
+    [Slice(3, 100, 2), 8, [3, 5, 7]],
+    [Slice(3, 100, 2), 2, []],
+])
+def test_slice_indices(segment, length, indices):
+    assert list(segment.indices(length)) == indices
+    if segment.is_forward():
+        assert [i for i in range(length) if segment.selects(i)] == indices
+
+
 def test_expression_path_to_string_raises():
     with pytest.raises(ValueError):
         expression(1.0).to_string()
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+import pytest
+import json_tabulator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(statement):
+    """Return the modules imported by running `statement` in a new interpreter."""
+    code = f'import sys; before = set(sys.modules); {statement}; print(" ".join(set(sys.modules) - before))'
+    result = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True, cwd=ROOT)
+    return set(result.stdout.split())
+
+
+def test_import_is_lazy():
+    modules = imported_modules('import json_tabulator')
+    assert not {'json_tabulator.api', 'json_tabulator.query', 'typing'} & modules
+
+
+@pytest.mark.parametrize('module', [
+    'json_tabulator.stream',
+    'asyncio',
+    'concurrent.futures',
+    'multiprocessing',
+    'pickle',
+    'numpy',
+    'pyarrow',
+])
+def test_tabulate_does_not_import(module):
+    assert module not in imported_modules('from json_tabulator import tabulate')
+
+
+def test_public_names():
+    for name in json_tabulator.__all__:
+        assert getattr(json_tabulator, name) is not None
+    assert set(json_tabulator.__all__) <= set(dir(json_tabulator))
+    with pytest.raises(AttributeError):
+        json_tabulator.unknown
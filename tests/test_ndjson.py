@@ -0,0 +1,83 @@
+import io
+import json
+import pickle
+import pytest
+from json_tabulator import tabulate, attribute, Columns
+from json_tabulator.exceptions import ConversionFailed
+from json_tabulator.ndjson import split_file, read_lines
+
+
+DOCUMENTS = [{'id': i, 'a': [{'x': str(j)} for j in range(i % 3)]} for i in range(200)]
+
+
+@pytest.fixture
+def query():
+    return tabulate({'id': 'id', 'x': attribute('a[*].x', converter=int)})
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    lines = [json.dumps(doc) for doc in DOCUMENTS]
+    lines.insert(10, '')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+def expected_rows(query):
+    return list(query.get_rows_many(DOCUMENTS))
+
+
+def test_split_file_and_read_lines_cover_all_lines(path):
+    ranges = split_file(path, 100)
+    lines = [line for start, end in ranges for line in read_lines(path, start, end)]
+    assert b''.join(lines) == path.read_bytes()
+
+
+@pytest.mark.parametrize('source', ['path', 'text', 'binary'])
+def test_sequential(query, path, source):
+    if source == 'path':
+        actual = list(query.get_rows_from_ndjson(path))
+    elif source == 'text':
+        actual = list(query.get_rows_from_ndjson(io.StringIO(path.read_text())))
+    else:
+        actual = list(query.get_rows_from_ndjson(io.BytesIO(path.read_bytes())))
+    assert actual == expected_rows(query)
+
+
+def test_parallel_ordered(query, path):
+    actual = list(query.get_rows_from_ndjson(path, workers=2, chunk_bytes=500))
+    assert actual == expected_rows(query)
+
+
+def test_parallel_unordered(query, path):
+    actual = list(query.get_rows_from_ndjson(path, workers=2, ordered=False, chunk_bytes=500))
+    key = lambda row: (row['id'], row['x'])  # noqa: E731
+    assert sorted(actual, key=key) == sorted(expected_rows(query), key=key)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_columns(query, path, workers):
+    chunks = list(query.get_rows_from_ndjson(path, workers=workers, columns=True, chunk_bytes=500))
+    assert len(chunks) > 1
+    assert all(isinstance(c, Columns) for c in chunks)
+    rows = expected_rows(query)
+    assert [x for c in chunks for x in c['x']] == [row['x'] for row in rows]
+
+
+def test_parallel_requires_path(query, path):
+    with pytest.raises(ValueError):
+        list(query.get_rows_from_ndjson(io.StringIO(path.read_text()), workers=2))
+
+
+def test_tabulator_is_picklable(query):
+    data = {'id': 1, 'a': [{'x': '1'}, {'x': 'abc'}]}
+    restored = pickle.loads(pickle.dumps(query))
+    assert list(restored.get_rows(data)) == list(query.get_rows(data))
+
+
+def test_rows_with_errors_are_picklable(query):
+    data = {'id': 1, 'a': [{'x': 'abc'}]}
+    row = pickle.loads(pickle.dumps(next(query.get_rows(data))))
+    assert isinstance(row.errors['x'], ConversionFailed)
+    assert row.errors['x'].value == 'abc'
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pytest
+
+from json_tabulator import tabulate, attribute
+from json_tabulator.converters import to_int
+from json_tabulator.guards import has_keys
+from json_tabulator.parallel import partition
+
+
+DATA = {
+    'meta': {'source': 's'},
+    'items': [{'id': str(i), 'tags': [{'name': f'{i}.{j}'} for j in range(i % 3)]} for i in range(50)],
+}
+DATA['items'][7]['id'] = 'x'
+
+
+@pytest.fixture(params=['threads', 'processes'])
+def executor(request):
+    with (ThreadPoolExecutor(2) if request.param == 'threads' else ProcessPoolExecutor(2)) as executor:
+        yield executor
+
+
+def assert_same_rows(query, data, **kwargs):
+    expected = list(query.get_rows(data))
+    actual = list(query.get_rows(data, **kwargs))
+    assert actual == expected
+    assert [row.errors.keys() for row in actual] == [row.errors.keys() for row in expected]
+
+
+@pytest.mark.parametrize('query', [
+    {'source': 'meta.source', 'id': attribute('items[*].id', converter=int), 'name': 'items[*].tags[*].name'},
+    {'id': attribute('items[*].id', batch_converter=to_int), 'missing': 'items[*].missing'},
+    {'i': 'items[*].(index)', 'p': 'items[*].tags[*].(path)'},
+    {'k': '$.*.(index)', 'v': '$.*.*'},
+])
+def test_same_rows(executor, query):
+    assert_same_rows(tabulate(query), DATA, executor=executor)
+
+
+def test_guards(executor):
+    query = tabulate({'name': 'items[*].tags[*].name'}, guards={'items[*]': has_keys('tags'), '$': has_keys('items')})
+    assert_same_rows(query, DATA, executor=executor)
+    assert list(query.get_rows({'x': 1}, executor=executor)) == []
+
+
+def test_no_rows(executor):
+    query = tabulate({'x': 'a[*].x'})
+    for data in [{}, {'a': 1}, {'a': []}]:
+        assert list(query.get_rows(data, executor=executor)) == []
+
+
+def test_without_wildcard_and_default_executor():
+    assert list(tabulate({'x': 'a'}).get_rows({'a': 1}, workers=2)) == [{'x': 1}]
+    assert_same_rows(tabulate({'id': 'items[*].id'}), DATA, workers=2)
+
+
+def test_limit(executor):
+    query = tabulate({'id': 'items[*].id', 'name': 'items[*].tags[*].name'})
+    for limit in [0, 5, 1000]:
+        assert list(query.get_rows(DATA, executor=executor, limit=limit)) == list(query.get_rows(DATA))[:limit]
+
+
+def test_stats_not_supported():
+    with pytest.raises(ValueError):
+        tabulate({'id': 'items[*].id'}).get_rows(DATA, workers=2, stats=[].append)
+
+
+def test_partition():
+    parts = partition(range(10), list('abcdefghij'), 4)
+    assert [list(keys) for keys, _ in parts] == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert [''.join(items) for _, items in parts] == ['abc', 'def', 'ghi', 'j']
+    assert partition([], [], 4) == []
@@ -1,6 +1,9 @@
+import random
 import pytest
-from json_tabulator.expression import STAR, INDEX, PATH, Inline, expression
-from json_tabulator.parser import parse_expression, InvalidExpression
+from parsy import ParseError
+from json_tabulator.expression import STAR, INDEX, PATH, Inline, Slice, expression
+from json_tabulator.parser import parse_expression, InvalidExpression, _parse_segments
+from .reference_parser import parse_reference
 
 
 @pytest.mark.parametrize('s, expected', [
@@ -19,9 +22,19 @@ from json_tabulator.parser import parse_expression, InvalidExpression
     ['"123"', ('123',)],
     ['"123"', ('123',)],
     ['*.b', (STAR, 'b')],
+    # negative indices and slices
+    ['a[-1]', ('a', -1)],
+    ['a[1:3]', ('a', Slice(1, 3))],
+    ['a[-2:]', ('a', Slice(-2))],
+    ['a[:-1]', ('a', Slice(None, -1))],
+    ['a[::-2]', ('a', Slice(None, None, -2))],
+    ['a[:]', ('a', Slice())],
+    ['a[1::]', ('a', Slice(1))],
+    ['[0:10].b', (Slice(0, 10), 'b')],
     # functions
     ['*.(index)', (STAR, INDEX)],
     ['*.(path)', (STAR, PATH)],
+    ['a[2:].(index)', ('a', Slice(2), INDEX)],
     ['a.(inline [*].b)', ('a', Inline(expression(STAR, 'b')))]
 ])
 def test_accepts(s, expected):
@@ -51,7 +64,46 @@ def test_accepts(s, expected):
     '123abc',  # unquoted key starting with number
     '123',
     'a.(inline $[*])',  # absolute path in inline
+    'a[::0]',  # zero step
+    'a[1:2:3:4]',
+    'a[-]',
+    'a[1 :2]',
+    'a[-1].(index)',  # function after a fixed index
 ])
 def test_rejects(s):
     with pytest.raises(InvalidExpression):
         parse_expression(s)
+
+
+def _random_expressions(n, seed=0):
+    rng = random.Random(seed)
+    tokens = [
+        'a', 'bc', ' ', '1', '23', '$', '.', '*', '[', ']', '(', ')', '"', "'", '\\',
+        '[*]', '[0]', '["x"]', "['y']", '(index)', '(path)', '(inline ', '(inline', '\\"', "\\'",
+        '-', ':', '0', '[-1]', '[1:]', '[::2]',
+    ]
+    for _ in range(n):
+        yield ''.join(rng.choice(tokens) for _ in range(rng.randint(0, 8)))
+
+
+@pytest.mark.parametrize('s', [
+    '"a\\"', '"a\\"b"', "'a\\'", '"a\\b"', 'a b', ' a', 'a.[ 1]', 'a[1 ]', 'a.(inline  b.c)',
+    'a.(inlineb)', 'a.(inline b.(index))', 'a.(inline b.)', '$[*]', '$*', '$a', 'a.1', '\u0661',
+])
+def test_matches_reference_grammar(s):
+    assert_matches_reference(s)
+
+
+def test_matches_reference_grammar_on_random_expressions():
+    for s in _random_expressions(20000):
+        assert_matches_reference(s)
+
+
+def assert_matches_reference(s):
+    try:
+        expected = parse_reference(s)
+    except ParseError:
+        with pytest.raises(InvalidExpression):
+            _parse_segments(s)
+    else:
+        assert _parse_segments(s) == expected, s
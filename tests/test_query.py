@@ -1,6 +1,12 @@
+import pickle
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from typing import Generator
 from json_tabulator import tabulate, Row
+from json_tabulator.query import NOT_FOUND, InlineQueryPlan, nested_get, _compile_lookup
+from json_tabulator.parser import parse_expression
 from json_tabulator.exceptions import IncompatiblePaths, AttributeNotFound
 
 
@@ -128,3 +134,183 @@ def test_inline():
     actual = list(q.get_rows(data))
     expected = [{'x': [1, 2]}]
     assert actual == expected
+
+
+def test_errors_are_not_shared_between_rows():
+    query = tabulate({'x': '$[*].a[*].x', 'y': '$[*].y'})
+    data = [{'a': [{}, {'x': 2}]}]
+    rows = list(query.get_rows(data))
+    assert set(rows[0].errors.keys()) == {'x', 'y'}
+    assert set(rows[1].errors.keys()) == {'y'}
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('$.a.b[*].c', [{'x': 1}, {'x': 2}]),
+    ('$.a.b[1].c', [{'x': 2}]),
+    ('$.a.x[*].c', []),
+    ('$.a.b[5].c', [{'x': None}]),
+])
+def test_fixed_segments_before_and_after_wildcard(path, expected):
+    data = {'a': {'b': [{'c': 1}, {'c': 2}]}}
+    q = tabulate({'x': path})
+    assert list(q.get_rows(data)) == expected
+
+
+class Test_lazy_errors:
+    def test_no_errors_dict_without_errors(self):
+        query = tabulate({'a': '$[*].a'})
+        row = next(query.get_rows([{'a': 1}]))
+        assert row._errors is None
+        assert row.errors == {}
+
+    def test_missing_attributes_are_materialized_on_access(self):
+        query = tabulate({'a': '$[*].a', 'b': '$[*].b'})
+        row = next(query.get_rows([{'b': 1}]))
+        assert row._errors == {'a': NOT_FOUND}
+        error = row.errors['a']
+        assert isinstance(error, AttributeNotFound)
+        assert row.errors['a'] is error
+
+    def test_pickle_keeps_placeholder(self):
+        query = tabulate({'a': '$[*].a'})
+        row = pickle.loads(pickle.dumps(next(query.get_rows([{}]))))
+        assert isinstance(row.errors['a'], AttributeNotFound)
+
+
+class Test_deep_paths:
+    def test_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        data = [1, 2]
+        for _ in range(depth - 1):
+            data = [data]
+        query = tabulate({'x': '$' + '[*]' * depth})
+        assert list(query.get_rows(data)) == [{'x': 1}, {'x': 2}]
+
+    def test_attributes_of_outer_levels_are_kept_after_inner_levels(self):
+        data = {'a': [
+            {'id': 1, 'b': {'c': [{'d': [{'v': 1}, {'v': 2}]}, {'d': []}, {'d': [{'v': 3}]}]}},
+            {'id': 2, 'b': {}},
+            {'id': 3, 'b': {'c': {'k': {'d': [{'v': 4}]}}}},
+        ]}
+        query = tabulate({
+            'id': '$.a[*].id',
+            'path': '$.a[*].b.c[*].(path)',
+            'v': '$.a[*].b.c[*].d[*].v',
+            'index': '$.a[*].b.c[*].d[*].(index)',
+        })
+        assert list(query.get_rows(data)) == [
+            {'id': 1, 'path': '$.a[0].b.c[0]', 'v': 1, 'index': 0},
+            {'id': 1, 'path': '$.a[0].b.c[0]', 'v': 2, 'index': 1},
+            {'id': 1, 'path': '$.a[0].b.c[2]', 'v': 3, 'index': 0},
+            {'id': 3, 'path': '$.a[2].b.c.k', 'v': 4, 'index': 0},
+        ]
+
+
+class Test_inline:
+    DATA = {'a': [
+        {'b': [{'c': 1}, {'c': 2, 'd': 'x'}, 3, {}], 'e': {'k': {'c': 4}, 'l': [5]}},
+        {'b': {'m': {'c': 6}}, 'e': None},
+        {'e': [[7]]},
+    ]}
+
+    @pytest.mark.parametrize('path', [
+        '[*].b[*].c',
+        '[*].b[*].d',
+        '[*].b[1].c',
+        '[*].e.*.c',
+        '[*].e.*[0]',
+        '[*].e[*][*]',
+        '[*].b',
+        '[*].b[*].(index)',
+        '[*].e.*.(path)',
+        '[*].(inline b[*].c)',
+        '[0].b[*]',
+        'x[*].c',
+    ])
+    def test_same_values_as_rows(self, path):
+        inline = InlineQueryPlan.from_expression(parse_expression(path))
+        expected = [row['_'] for row in inline.plan.execute(self.DATA['a'])]
+        assert inline.execute(self.DATA['a']) == expected
+
+    def test_attributes_with_same_table_share_plan(self):
+        query = tabulate({
+            'c': '$.a[*].(inline b[*].c)',
+            'd': '$.a[*].(inline b[*].d)',
+            'e': '$.a[*].(inline e.*.c)',
+        })
+        items = query._plan.extracts[parse_expression('$.a[*]')]
+        assert items['c'][-1].plan is items['d'][-1].plan
+        assert items['c'][-1].plan is not items['e'][-1].plan
+        assert list(query.get_rows(self.DATA)) == [
+            {'c': [1, 2, 3, None], 'd': [None, 'x', 3, None], 'e': [4, None]},
+            {'c': [6], 'd': [None], 'e': []},
+            {'c': [], 'd': [], 'e': [None]},
+        ]
+
+    def test_missing_inline_attributes(self):
+        query = tabulate({'c': '$.a[*].b.(inline [*].c)', 'd': '$.a[*].b.(inline [*].d)'})
+        rows = list(query.get_rows(self.DATA))
+        assert rows[2] == {'c': None, 'd': None}
+        assert set(rows[2].errors) == {'c', 'd'}
+
+    def test_shared_plan_is_thread_safe(self):
+        interval = sys.getswitchinterval()
+        # switch threads often, so that concurrent runs interleave
+        sys.setswitchinterval(1e-6)
+        try:
+            query = {'x': 'a[*].(inline v[*].p)', 'y': 'a[*].(inline v[*].q)'}
+            documents = [{'a': [{'v': [{'p': k, 'q': k}] * 3}] * 200} for k in range(8)]
+
+            def run(doc):
+                return all(row['x'] == row['y'] for _ in range(5) for row in tabulate(query).get_rows(doc))
+
+            with ThreadPoolExecutor(8) as executor:
+                assert all(executor.map(run, documents))
+                data = {'a': [{'v': [{'p': k, 'q': k}]} for k in range(2000)]}
+                rows = list(tabulate(query).get_rows(data, executor=executor))
+                assert all(row['x'] == row['y'] for row in rows)
+        finally:
+            sys.setswitchinterval(interval)
+
+
+class Test_lookup:
+    KEYS = ['a', 'b', 0, 1]
+
+    def random_value(self, rng, depth):
+        kind = rng.randrange(4) if depth else 3
+        if kind == 0:
+            return {k: self.random_value(rng, depth - 1) for k in rng.sample(self.KEYS, rng.randint(0, 3))}
+        elif kind == 1:
+            return [self.random_value(rng, depth - 1) for _ in range(rng.randint(0, 2))]
+        elif kind == 2:
+            return None
+        return rng.randint(0, 9)
+
+    def test_same_as_nested_get(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            paths = [
+                tuple(rng.choice(self.KEYS) for _ in range(rng.randint(0, 3)))
+                for _ in range(rng.randint(1, 6))
+            ]
+            data = self.random_value(rng, 3)
+            lookup = _compile_lookup(list(enumerate(paths)), NOT_FOUND)
+            values, errors = [object()] * len(paths), [object()] * len(paths)
+            lookup(data, None, values, errors)
+            for slot, keys in enumerate(paths):
+                value, found = nested_get(data, keys)
+                assert values[slot] is value
+                assert errors[slot] is (None if found else NOT_FOUND)
+
+    def test_missing_prefix(self):
+        query = tabulate({'x': '$[*].a.b.x', 'y': '$[*].a.b.y', 'z': '$[*].a.z'})
+        rows = list(query.get_rows([{'a': {'z': 1}}, {'a': {'b': {'x': 2}}}]))
+        assert rows == [{'x': None, 'y': None, 'z': 1}, {'x': 2, 'y': None, 'z': None}]
+        assert set(rows[0].errors) == {'x', 'y'}
+        assert set(rows[1].errors) == {'y', 'z'}
+
+    def test_ignore_errors(self):
+        query = tabulate({'x': '$[*].a.b.x', 'y': '$[*].a.y'}, errors='ignore')
+        rows = list(query.get_rows([{'a': {'y': 1}}]))
+        assert rows == [{'x': None, 'y': 1}]
+        assert rows[0].errors == {}
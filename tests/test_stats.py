@@ -0,0 +1,83 @@
+import pytest
+
+from json_tabulator import tabulate, attribute
+from json_tabulator.converters import to_int
+from json_tabulator.guards import has_keys
+from json_tabulator.stats import Stats
+
+
+DATA = {'items': [
+    {'id': '1', 'tags': [{'name': 'a'}]},
+    {'id': 'x'},
+    {'id': '3', 'tags': [{'name': 'b'}, {'name': 'c'}]},
+]}
+
+
+def test_counts():
+    query = tabulate({
+        'id': attribute('items[*].id', converter=int),
+        'name': 'items[*].tags[*].name',
+        'missing': 'items[*].missing',
+    })
+    stats = Stats()
+    rows = list(query.get_rows(DATA, stats=stats))
+    assert rows == list(query.get_rows(DATA))
+    assert stats.documents == 1
+    assert stats.rows == 3
+    assert stats.nodes == 3 + 3
+    assert stats.missing == {'missing': 3}
+    assert stats.conversion_failures == {}
+
+
+def test_conversion_failures_and_times():
+    query = tabulate({
+        'id': attribute('items[*].id', converter=int),
+        'batch': attribute('items[*].id', batch_converter=to_int),
+        'tags': 'items[*].(inline tags[*].name)',
+    })
+    stats = Stats()
+    list(query.get_rows(DATA, stats=stats))
+    assert stats.conversion_failures == {'id': 1, 'batch': 1}
+    assert set(stats.converter_times) == {'id', 'batch'}
+    times = stats.times
+    assert times['total'] >= times['traversal'] >= times['inline'] > 0
+    assert times['conversion'] == pytest.approx(sum(stats.converter_times.values()))
+
+
+def test_accumulates_over_runs():
+    query = tabulate({'id': 'items[*].id'})
+    stats = Stats()
+    list(query.get_rows(DATA, stats=stats))
+    list(query.get_rows_many([DATA, DATA], stats=stats))
+    assert (stats.documents, stats.rows) == (3, 9)
+
+
+def test_counts_elements_rejected_by_guards():
+    query = tabulate({'name': 'items[*].tags[*].name'}, guards={'items[*]': has_keys('tags')})
+    stats = Stats()
+    list(query.get_rows(DATA, stats=stats))
+    assert stats.rows == 3
+    assert stats.nodes == 3 + 3
+
+
+def test_callback_receives_dict():
+    reports = []
+    query = tabulate({'id': 'items[*].id', 'missing': 'items[*].missing'})
+    rows = list(query.get_rows_many([DATA], with_ordinal=True, stats=reports.append))
+    assert rows == list(query.get_rows_many([DATA], with_ordinal=True))
+    report, = reports
+    assert report['rows'] == 3
+    assert report['missing'] == {'missing': 3}
+    assert type(report['missing']) is dict
+
+
+def test_does_not_change_query():
+    query = tabulate({'id': attribute('items[*].id', converter=int)})
+    list(query.get_rows(DATA, stats=Stats()))
+    assert query.attributes[0].converter is int
+    assert all(guard is None for guard in query._plan._star_guards)
+
+
+def test_invalid_stats():
+    with pytest.raises(TypeError):
+        tabulate({'id': 'items[*].id'}).get_rows(DATA, stats=1)
@@ -0,0 +1,165 @@
+import io
+import json
+import pytest
+from json_tabulator import tabulate, attribute, guards
+from json_tabulator.expression import STAR
+from json_tabulator.stream import JsonReader
+
+
+DOCUMENTS = [
+    {'id': 'doc', 'a': [{'x': 1, 'y': {'z': [1, 2]}}, {'x': 'two'}, 3], 'b': {'k': {'x': None}}},
+    {'a': [{'x': 1}], 'id': 'id-after-table', 'c': [1, [2, {'d': 'e'}]]},
+    {'a': {'p': {'x': 1.5e3}, 'q': {'x': -2}}, 'id': True},
+    [{'id': 1, 'a': []}, {'id': 2, 'a': [{'x': 'a\\"b'}]}, None],
+    {'a': 'not a list', 'id': {'nested': [1, {'x': False}]}},
+]
+
+QUERIES = [
+    {'id': 'id', 'x': 'a[*].x'},
+    {'x': 'a[*].x', 'z': 'a[*].y.z[*]', 'id': 'id'},
+    {'i': 'a[*].(index)', 'p': 'a[*].(path)', 'z': 'a[*].y.z[1]'},
+    {'x': 'a[1].x', 'c': 'c[1][1].d'},
+    {'id': '$[*].id', 'x': '$[*].a[*].x'},
+    {'all': '$', 'x': 'a[*].x'},
+    {'k': 'b.*.x', 'i': 'b.*.(index)'},
+    {'x': 'a[*].(inline y.z[*])'},
+    {'first': '$[0].id', 'x': '$[1].a[*].x'},
+    {'id': 'id', 'a': 'a', 'x': 'a[*].x'},
+    # only the presence of elements is needed, `id` comes after the table
+    {'id': 'id', 'i': 'a[*].(index)'},
+    {'id': 'id', 'p': 'a[*].y.z[*].(path)'},
+    {'c': 'c[1][1].d', 'i': 'a[*].(index)'},
+]
+
+
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_stream_matches_in_memory_rows(query, chunk_size):
+    q = tabulate(query)
+    for doc in DOCUMENTS:
+        text = json.dumps(doc)
+        expected = list(q.get_rows(doc))
+        actual = list(q.get_rows_from_json(io.StringIO(text), chunk_size=chunk_size))
+        assert actual == expected
+        assert [r.errors.keys() for r in actual] == [r.errors.keys() for r in expected]
+
+
+@pytest.mark.parametrize('guard', [
+    guards.has_keys('x'),
+    guards.field_in('x', 1, -2),
+    guards.is_type(dict),
+    lambda item: isinstance(item, dict) and 'y' in item,
+])
+@pytest.mark.parametrize('chunk_size', [1, 1024])
+def test_stream_with_guards_matches_in_memory_rows(guard, chunk_size):
+    q = tabulate({'id': 'id', 'x': 'a[*].x', 'i': 'a[*].(index)'}, guards={'a[*]': guard})
+    for doc in DOCUMENTS:
+        text = json.dumps(doc)
+        expected = list(q.get_rows(doc))
+        assert list(q.get_rows_from_json(io.StringIO(text), chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize('where', [
+    [('id', '==', 'doc')],
+    [('a[*].x', '>=', 1)],
+    [('id', 'in', ['doc', True]), ('a[*].y.z', '==', [1, 2])],
+])
+def test_stream_with_where_matches_in_memory_rows(where):
+    q = tabulate({'id': 'id', 'x': 'a[*].x'}, where=where)
+    for doc in DOCUMENTS:
+        assert list(q.get_rows_from_json(json.dumps(doc), chunk_size=3)) == list(q.get_rows(doc))
+
+
+@pytest.mark.parametrize('query', [
+    {'i': 'a[*].(index)'},
+    {'p': 'a[*].(path)'},
+    {'i': 'a[-1:].(index)'},
+])
+def test_stream_with_root_guard_and_presence_only_wildcard(query):
+    q = tabulate(query, where=[('id', '==', 'id-after-table')])
+    doc = DOCUMENTS[1]
+    assert list(q.get_rows_from_json(json.dumps(doc), chunk_size=3)) == list(q.get_rows(doc)) != []
+
+
+@pytest.mark.parametrize('source', [
+    '[{"a": 1}, {"a": 2}]',
+    b'[{"a": 1}, {"a": 2}]',
+    io.BytesIO(b'[{"a": 1}, {"a": 2}]'),
+    [b'[{"a": 1', b'}, {"a"', b': 2}]'],
+])
+def test_accepts_sources(source):
+    q = tabulate({'a': '$[*].a'})
+    assert list(q.get_rows_from_json(source)) == [{'a': 1}, {'a': 2}]
+
+
+def test_decodes_multibyte_characters_split_between_chunks():
+    data = json.dumps([{'a': 'äöü€'}], ensure_ascii=False).encode()
+    chunks = [data[i:i + 1] for i in range(len(data))]
+    q = tabulate({'a': '$[*].a'})
+    assert list(q.get_rows_from_json(chunks)) == [{'a': 'äöü€'}]
+
+
+def test_applies_converters():
+    q = tabulate({'a': attribute('$[*].a', converter=int, default=0)})
+    assert list(q.get_rows_from_json('[{"a": "1"}, {}]')) == [{'a': 1}, {'a': 0}]
+
+
+def test_yields_rows_before_end_of_document():
+    def chunks():
+        yield '{"id": "doc", "a": [{"x": 1}, '
+        raise AssertionError('read too far')
+
+    q = tabulate({'id': 'id', 'x': 'a[*].x'})
+    rows = q.get_rows_from_json(chunks())
+    assert next(rows) == {'id': 'doc', 'x': 1}
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '[{"a": 1}',
+    '[{"a": 1}] x',
+    '[{"a" 1}]',
+    '[{"a": tru}]',
+    '[{"a": "x}]',
+])
+def test_raises_for_invalid_json(text):
+    q = tabulate({'a': '$[*].a'})
+    with pytest.raises(json.JSONDecodeError):
+        list(q.get_rows_from_json(text))
+
+
+@pytest.mark.parametrize('text', [
+    '{"a": [{"x": 1}',
+    '{"a": [{"x": 1},\n  {"x": 2 "y"}]}',
+    '{"a": [{"x": "\\q"}]}',
+])
+def test_error_position_is_relative_to_whole_input(text):
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    q = tabulate({'x': 'a[*].x'})
+    with pytest.raises(json.JSONDecodeError) as actual:
+        list(q.get_rows_from_json(io.StringIO(text), chunk_size=1))
+    assert (actual.value.pos, actual.value.lineno, actual.value.colno) == (
+        expected.value.pos, expected.value.lineno, expected.value.colno)
+    assert str(actual.value) == str(expected.value)
+
+
+class Test_JsonReader:
+    @pytest.mark.parametrize('value', [
+        0, -1, 1.5, 2e-3, 'a"\\b\u00e4', True, False, None, [], {}, [1, {'a': [None]}],
+    ])
+    def test_read_value(self, value):
+        reader = JsonReader(json.dumps(value))
+        assert reader.read_value() == value
+
+    def test_read_pruned(self):
+        data = {'a': {'b': 1, 'c': 2}, 'd': [0, 1, 2, 3], 'e': [{'f': 1, 'g': 2}]}
+        spec = {'a': {'b': True}, 'd': {1: True}, 'e': {STAR: {'g': True}}}
+        reader = JsonReader(json.dumps(data))
+        actual = reader.read_pruned(spec)
+        assert actual == {'a': {'b': 1}, 'd': [None, 1], 'e': [{'g': 2}]}
+
+    def test_skip_value(self):
+        reader = JsonReader('[{"a": "]}\\""}, [1, [2]]] 3')
+        reader.skip_value()
+        assert reader.read_value() == 3